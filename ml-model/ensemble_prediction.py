@@ -14,21 +14,65 @@ from sklearn.svm import SVR
 from sklearn.neural_network import MLPRegressor
 from sklearn.preprocessing import StandardScaler, RobustScaler
 from sklearn.model_selection import TimeSeriesSplit, cross_val_score
-from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
+from sklearn.metrics import mean_squared_error
 import joblib
+from joblib import Parallel, delayed
+from sklearn.base import clone
+import copy
+import hashlib
 import logging
+import os
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from typing import Dict, List, Tuple, Any
 import json
 from datetime import datetime, timedelta
 import warnings
 warnings.filterwarnings('ignore')
 
+# Model artifacts are LZ4-compressed when the lz4 package is available;
+# it decompresses far faster than zlib, which is the fallback
+try:
+    import lz4  # noqa: F401
+    ARTIFACT_COMPRESSION = ('lz4', 3)
+except ImportError:
+    ARTIFACT_COMPRESSION = ('zlib', 3)
+
 class EnsembleSardinePredictor:
     """
     Advanced ensemble predictor combining multiple ML algorithms
     for sardine school location and density prediction
     """
     
+    # Habitat ranges used for indicator features
+    OPTIMAL_TEMP_RANGE = (16, 20)
+    OPTIMAL_DEPTH_RANGE = (50, 150)
+    HIGH_CHLOROPHYLL_THRESHOLD = 1.0
+    
+    # Binary indicator features, stored as int8
+    INDICATOR_FEATURES = ('optimal_temp_range', 'high_chlorophyll', 'optimal_depth')
+    
+    # Low-cardinality features left unscaled and split as categories by LightGBM
+    CATEGORICAL_FEATURES = ('month',)
+    
+    # Seasonal encoding: radians per month and lookup tables indexed by month % 12
+    _MONTH_ANGLE = np.float32(2 * np.pi / 12)
+    _MONTH_SIN = np.sin(_MONTH_ANGLE * np.arange(12, dtype=np.float32))
+    _MONTH_COS = np.cos(_MONTH_ANGLE * np.arange(12, dtype=np.float32))
+    
+    # Number of engineered feature frames kept for repeated inputs
+    FEATURE_CACHE_SIZE = 8
+    
+    # Number of preprocessed training sets kept for repeated inputs
+    PREPROCESS_CACHE_SIZE = 4
+    
+    # Floor on cross-validated RMSE when deriving inverse-error weights
+    MIN_RMSE = 1e-12
+    
+    # Dirichlet concentration of the weight samples drawn for uncertainty
+    WEIGHT_CONCENTRATION = 20.0
+    
     def __init__(self, config_path: str = None):
         """
         Initialize the ensemble predictor
@@ -40,8 +84,15 @@ class EnsembleSardinePredictor:
         self.models = {}
         self.scalers = {}
         self.weights = {}
+        self._weight_vector = None
         self.feature_importance = {}
         self.prediction_history = []
+        self._predictors = {}
+        self._chunk_predictors = {}
+        self._feature_cache = OrderedDict()
+        self._preprocess_cache = OrderedDict()
+        self._cache_stats = {'hits': 0, 'misses': 0}
+        self._feature_medians = None
         
         # Setup logging
         logging.basicConfig(
@@ -52,6 +103,12 @@ class EnsembleSardinePredictor:
         
         # Initialize models
         self._initialize_models()
+        
+        # Base models predict concurrently; their backends release the GIL
+        self._executor = ThreadPoolExecutor(max_workers=len(self.models))
+        
+        # Large batches are split into row chunks predicted on every core
+        self._chunk_executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 1)
     
     def _load_config(self, config_path: str) -> Dict:
         """Load configuration from file"""
@@ -69,14 +126,17 @@ class EnsembleSardinePredictor:
                     'max_depth': 8,
                     'learning_rate': 0.05,
                     'subsample': 0.8,
-                    'colsample_bytree': 0.8
+                    'colsample_bytree': 0.8,
+                    'max_bin': 256,
+                    'grow_policy': 'lossguide'
                 },
                 'lightgbm': {
                     'n_estimators': 500,
                     'max_depth': 8,
                     'learning_rate': 0.05,
                     'num_leaves': 50,
-                    'feature_fraction': 0.8
+                    'feature_fraction': 0.8,
+                    'max_bin': 255
                 },
                 'catboost': {
                     'iterations': 500,
@@ -101,6 +161,10 @@ class EnsembleSardinePredictor:
                 'cv_folds': 5,
                 'test_size': 0.2,
                 'random_state': 42
+            },
+            'inference': {
+                'chunk_size': 128,
+                'chunk_min_rows': 2000
             }
         }
         
@@ -116,59 +180,45 @@ class EnsembleSardinePredictor:
     
     def _initialize_models(self):
         """Initialize all ML models with optimized parameters"""
+        params = self.config['models']
+        random_state = self.config['validation']['random_state']
         
         # XGBoost
         self.models['xgboost'] = xgb.XGBRegressor(
             objective='reg:squarederror',
-            n_estimators=self.config['models']['xgboost']['n_estimators'],
-            max_depth=self.config['models']['xgboost']['max_depth'],
-            learning_rate=self.config['models']['xgboost']['learning_rate'],
-            subsample=self.config['models']['xgboost']['subsample'],
-            colsample_bytree=self.config['models']['xgboost']['colsample_bytree'],
-            random_state=self.config['validation']['random_state'],
+            **params['xgboost'],
+            tree_method='hist',
+            random_state=random_state,
             n_jobs=-1
         )
         
         # LightGBM
         self.models['lightgbm'] = lgb.LGBMRegressor(
             objective='regression',
-            n_estimators=self.config['models']['lightgbm']['n_estimators'],
-            max_depth=self.config['models']['lightgbm']['max_depth'],
-            learning_rate=self.config['models']['lightgbm']['learning_rate'],
-            num_leaves=self.config['models']['lightgbm']['num_leaves'],
-            feature_fraction=self.config['models']['lightgbm']['feature_fraction'],
-            random_state=self.config['validation']['random_state'],
+            **params['lightgbm'],
+            random_state=random_state,
             n_jobs=-1,
             verbose=-1
         )
         
         # CatBoost
         self.models['catboost'] = cb.CatBoostRegressor(
-            iterations=self.config['models']['catboost']['iterations'],
-            depth=self.config['models']['catboost']['depth'],
-            learning_rate=self.config['models']['catboost']['learning_rate'],
-            l2_leaf_reg=self.config['models']['catboost']['l2_leaf_reg'],
-            random_state=self.config['validation']['random_state'],
+            **params['catboost'],
+            random_state=random_state,
             verbose=False
         )
         
         # Random Forest
         self.models['random_forest'] = RandomForestRegressor(
-            n_estimators=self.config['models']['random_forest']['n_estimators'],
-            max_depth=self.config['models']['random_forest']['max_depth'],
-            min_samples_split=self.config['models']['random_forest']['min_samples_split'],
-            min_samples_leaf=self.config['models']['random_forest']['min_samples_leaf'],
-            random_state=self.config['validation']['random_state'],
+            **params['random_forest'],
+            random_state=random_state,
             n_jobs=-1
         )
         
         # Gradient Boosting
         self.models['gradient_boosting'] = GradientBoostingRegressor(
-            n_estimators=self.config['models']['gradient_boosting']['n_estimators'],
-            max_depth=self.config['models']['gradient_boosting']['max_depth'],
-            learning_rate=self.config['models']['gradient_boosting']['learning_rate'],
-            subsample=self.config['models']['gradient_boosting']['subsample'],
-            random_state=self.config['validation']['random_state']
+            **params['gradient_boosting'],
+            random_state=random_state
         )
         
         # Initialize scalers
@@ -179,70 +229,210 @@ class EnsembleSardinePredictor:
         """
         Preprocess data for model training
         
+        Results are cached per input fingerprint together with the fitted
+        medians and scaler, so retraining or updating weights on the same
+        frame restores that state instead of recomputing it. The returned
+        arrays are shared with the cache and read-only.
+        
         Args:
             data: Raw dataframe with features and target
             
         Returns:
-            Tuple of (X, y) arrays
+            Tuple of (X, y) float32 arrays
         """
+        key = self._fingerprint(data)
+        if key in self._preprocess_cache:
+            self._preprocess_cache.move_to_end(key)
+            self._cache_stats['hits'] += 1
+            X_scaled, y, self._feature_medians, self.scalers['standard'] = self._preprocess_cache[key]
+            return X_scaled, y
+        self._cache_stats['misses'] += 1
+        
         # Separate features and target
         X = data.drop(['sardine_density', 'timestamp'], axis=1, errors='ignore')
         y = data['sardine_density']
         
-        # Handle missing values
-        X = X.fillna(X.median())
+        # Handle missing values, recording the medians for inference
+        self._feature_medians = X.median()
+        X = self._impute_missing(X)
+        
+        # Downcast 64-bit numeric columns; the models train on float32 anyway
+        X = X.astype({column: np.float32 for column in X.select_dtypes(['float64', 'int64']).columns})
         
         # Feature engineering
         X = self._feature_engineering(X)
         
-        # Scale features
-        X_scaled = self.scalers['standard'].fit_transform(X)
+        # Scale features with a fresh scaler so cached ones stay untouched;
+        # categorical columns pass through with their raw codes
+        scaler = clone(self.scalers['standard']).fit(X)
+        categorical = np.isin(scaler.feature_names_in_, self.CATEGORICAL_FEATURES)
+        scaler.mean_[categorical] = 0.0
+        scaler.var_[categorical] = 1.0
+        scaler.scale_[categorical] = 1.0
+        self.scalers['standard'] = scaler
+        X_scaled = self._scale_features(X)
+        y = y.to_numpy(dtype=np.float32)
+        
+        X_scaled.setflags(write=False)
+        y.setflags(write=False)
+        self._preprocess_cache[key] = (X_scaled, y, self._feature_medians, self.scalers['standard'])
+        if len(self._preprocess_cache) > self.PREPROCESS_CACHE_SIZE:
+            self._preprocess_cache.popitem(last=False)
+        
+        return X_scaled, y
+    
+    def _impute_missing(self, X: pd.DataFrame) -> pd.DataFrame:
+        """
+        Fill missing values with the medians recorded during preprocessing
+        
+        Args:
+            X: Feature dataframe
+            
+        Returns:
+            Dataframe without missing values (the input itself if it has none)
+        """
+        if self._feature_medians is None or not X.isna().to_numpy().any():
+            return X
         
-        return X_scaled, y.values
+        return X.fillna(self._feature_medians)
     
     def _feature_engineering(self, X: pd.DataFrame) -> pd.DataFrame:
         """
         Create additional features for better prediction
         
+        Results are cached per input fingerprint, so training, evaluation and
+        weight updates on the same frame only engineer features once.
+        
+        Args:
+            X: Feature dataframe
+            
+        Returns:
+            Enhanced feature dataframe
+        """
+        key = self._fingerprint(X)
+        if key in self._feature_cache:
+            self._feature_cache.move_to_end(key)
+            return self._feature_cache[key]
+        
+        engineered = self._engineer_features(X)
+        
+        self._feature_cache[key] = engineered
+        if len(self._feature_cache) > self.FEATURE_CACHE_SIZE:
+            self._feature_cache.popitem(last=False)
+        
+        return engineered
+    
+    @staticmethod
+    def _range_indicator(values: np.ndarray, low: float, high: float, out: np.ndarray):
+        """
+        Write 1 where low <= values <= high and 0 elsewhere into out
+        
+        Args:
+            values: Feature column
+            low: Inclusive lower bound
+            high: Inclusive upper bound
+            out: float32 output column
+        """
+        np.less_equal(values, high, out=out, casting='unsafe')
+        out *= values >= low
+    
+    @staticmethod
+    def _fingerprint(X: pd.DataFrame) -> Tuple:
+        """
+        Compute a cache key from the column names, index and values of a frame
+        
+        Args:
+            X: Feature dataframe
+            
+        Returns:
+            Hashable fingerprint
+        """
+        row_hashes = pd.util.hash_pandas_object(X, index=True).to_numpy()
+        digest = hashlib.blake2b(row_hashes.tobytes(), digest_size=16).digest()
+        return tuple(X.columns), digest
+    
+    def _engineer_features(self, X: pd.DataFrame) -> pd.DataFrame:
+        """
+        Compute the engineered features for a frame
+        
         Args:
             X: Feature dataframe
             
         Returns:
             Enhanced feature dataframe
         """
+        columns = X.columns
+        has_temp = 'sea_surface_temp' in columns
+        has_chlorophyll = 'chlorophyll' in columns
+        has_depth = 'depth' in columns
+        
+        names = []
+        if has_temp:
+            names += ['temp_squared', 'temp_cubed', 'optimal_temp_range']
+        if has_chlorophyll:
+            names += ['chlorophyll_squared', 'chlorophyll_log', 'high_chlorophyll']
+        if has_depth:
+            names += ['depth_squared', 'depth_log', 'optimal_depth']
+        if has_temp and has_chlorophyll:
+            names.append('temp_chlorophyll_interaction')
+        if has_temp and has_depth:
+            names.append('temp_depth_interaction')
+        if 'month' in columns:
+            names += ['sin_month', 'cos_month']
+        
+        # Every engineered feature is written in place into one float32 buffer
+        buffer = np.empty((len(names), len(X)), dtype=np.float32)
+        out = dict(zip(names, buffer))
+        
         # Temperature-related features
-        if 'sea_surface_temp' in X.columns:
-            X['temp_squared'] = X['sea_surface_temp'] ** 2
-            X['temp_cubed'] = X['sea_surface_temp'] ** 3
-            X['optimal_temp_range'] = ((X['sea_surface_temp'] >= 16) & 
-                                       (X['sea_surface_temp'] <= 20)).astype(int)
+        if has_temp:
+            sst = X['sea_surface_temp'].to_numpy(dtype=np.float32)
+            low, high = self.OPTIMAL_TEMP_RANGE
+            np.multiply(sst, sst, out=out['temp_squared'])
+            np.multiply(out['temp_squared'], sst, out=out['temp_cubed'])
+            self._range_indicator(sst, low, high, out['optimal_temp_range'])
         
         # Chlorophyll features
-        if 'chlorophyll' in X.columns:
-            X['chlorophyll_squared'] = X['chlorophyll'] ** 2
-            X['chlorophyll_log'] = np.log1p(X['chlorophyll'])
-            X['high_chlorophyll'] = (X['chlorophyll'] > 1.0).astype(int)
+        if has_chlorophyll:
+            chlorophyll = X['chlorophyll'].to_numpy(dtype=np.float32)
+            np.multiply(chlorophyll, chlorophyll, out=out['chlorophyll_squared'])
+            np.log1p(chlorophyll, out=out['chlorophyll_log'])
+            np.greater(chlorophyll, self.HIGH_CHLOROPHYLL_THRESHOLD, out=out['high_chlorophyll'], casting='unsafe')
         
         # Depth features
-        if 'depth' in X.columns:
-            X['depth_squared'] = X['depth'] ** 2
-            X['depth_log'] = np.log1p(X['depth'])
-            X['optimal_depth'] = ((X['depth'] >= 50) & 
-                                  (X['depth'] <= 150)).astype(int)
+        if has_depth:
+            depth = X['depth'].to_numpy(dtype=np.float32)
+            low, high = self.OPTIMAL_DEPTH_RANGE
+            np.multiply(depth, depth, out=out['depth_squared'])
+            np.log1p(depth, out=out['depth_log'])
+            self._range_indicator(depth, low, high, out['optimal_depth'])
         
         # Interaction features
-        if 'sea_surface_temp' in X.columns and 'chlorophyll' in X.columns:
-            X['temp_chlorophyll_interaction'] = X['sea_surface_temp'] * X['chlorophyll']
+        if has_temp and has_chlorophyll:
+            np.multiply(sst, chlorophyll, out=out['temp_chlorophyll_interaction'])
         
-        if 'sea_surface_temp' in X.columns and 'depth' in X.columns:
-            X['temp_depth_interaction'] = X['sea_surface_temp'] * X['depth']
+        if has_temp and has_depth:
+            np.multiply(sst, depth, out=out['temp_depth_interaction'])
         
         # Seasonal features
-        if 'month' in X.columns:
-            X['sin_month'] = np.sin(2 * np.pi * X['month'] / 12)
-            X['cos_month'] = np.cos(2 * np.pi * X['month'] / 12)
-        
-        return X
+        if 'month' in columns:
+            month = X['month'].to_numpy(dtype=np.float32)
+            if np.all(month == np.floor(month)):
+                # Whole months: gather from the lookup tables
+                month_idx = month.astype(np.int64) % 12
+                np.take(self._MONTH_SIN, month_idx, out=out['sin_month'])
+                np.take(self._MONTH_COS, month_idx, out=out['cos_month'])
+            else:
+                # The angle is staged in the cos column and overwritten last
+                np.multiply(month, self._MONTH_ANGLE, out=out['cos_month'])
+                np.sin(out['cos_month'], out=out['sin_month'])
+                np.cos(out['cos_month'], out=out['cos_month'])
+        
+        engineered = pd.DataFrame(buffer.T, index=X.index, columns=names)
+        engineered = engineered.astype({
+            name: np.int8 for name in self.INDICATOR_FEATURES if name in out
+        })
+        return pd.concat([X, engineered], axis=1)
     
     def train_models(self, data: pd.DataFrame) -> Dict[str, Any]:
         """
@@ -262,22 +452,33 @@ class EnsembleSardinePredictor:
         # Time series cross-validation
         tscv = TimeSeriesSplit(n_splits=self.config['validation']['cv_folds'])
         
-        results = {}
-        
-        # Train each model
-        for name, model in self.models.items():
+        # Train models in parallel worker processes, at most one per core,
+        # splitting the cores between them so each model's own threading
+        # does not oversubscribe
+        n_cores = os.cpu_count() or 1
+        n_workers = min(len(self.models), n_cores)
+        n_threads = max(1, n_cores // len(self.models))
+        for name in self.models:
             self.logger.info(f"Training {name} model...")
-            
-            # Cross-validation
-            cv_scores = cross_val_score(
-                model, X, y, 
-                cv=tscv, 
-                scoring='neg_mean_squared_error',
-                n_jobs=-1
-            )
-            
-            # Train on full dataset
-            model.fit(X, y)
+        
+        # LightGBM splits categorical columns on category subsets
+        categorical = np.flatnonzero(
+            np.isin(self.scalers['standard'].feature_names_in_, self.CATEGORICAL_FEATURES)
+        ).tolist()
+        fit_params = [
+            {'categorical_feature': categorical}
+            if isinstance(model, lgb.LGBMRegressor) and categorical else {}
+            for model in self.models.values()
+        ]
+        
+        trained = Parallel(n_jobs=n_workers, backend='loky')(
+            delayed(_train_model)(clone(model), X, y, tscv, n_threads, params)
+            for model, params in zip(self.models.values(), fit_params)
+        )
+        
+        results = {}
+        for name, (model, cv_scores) in zip(list(self.models), trained):
+            self.models[name] = model
             
             # Store results
             results[name] = {
@@ -285,14 +486,23 @@ class EnsembleSardinePredictor:
                 'cv_std': cv_scores.std(),
                 'model': model
             }
-            
-            # Store feature importance if available
-            if hasattr(model, 'feature_importances_'):
-                self.feature_importance[name] = model.feature_importances_
+        
+        # Feature importances of all models as rows of one float16 matrix
+        importances = {
+            name: model.feature_importances_
+            for name, model in self.models.items()
+            if hasattr(model, 'feature_importances_')
+        }
+        if importances:
+            matrix = np.vstack(list(importances.values())).astype(np.float16)
+            self.feature_importance = dict(zip(importances, matrix))
         
         # Calculate ensemble weights based on performance
         self._calculate_ensemble_weights(results)
         
+        # Bind low-overhead inference entry points
+        self._compile_predictors()
+        
         # Save trained models
         self._save_models()
         
@@ -311,99 +521,254 @@ class EnsembleSardinePredictor:
         Args:
             results: Individual model results
         """
-        # Use inverse of RMSE as performance metric
-        performances = {}
-        for name, result in results.items():
-            performances[name] = 1.0 / result['cv_rmse']
+        names = list(results)
         
-        # Normalize weights
-        total_performance = sum(performances.values())
-        for name in performances:
-            self.weights[name] = performances[name] / total_performance
+        # Use inverse of RMSE as performance metric, normalized; a perfect
+        # fit is floored so it dominates instead of dividing by zero
+        rmse = np.fromiter((results[name]['cv_rmse'] for name in names), dtype=np.float64, count=len(names))
+        weights = 1.0 / np.maximum(rmse, self.MIN_RMSE)
+        weights /= weights.sum()
         
-        # Apply configuration-based adjustments
+        # Apply configuration-based adjustments where a model has a configured weight
         config_weights = self.config['ensemble']
-        for name in self.weights:
-            if name in config_weights:
-                self.weights[name] = (self.weights[name] + config_weights[name]) / 2
+        prior = np.array([config_weights.get(f'{name}_weight', np.nan) for name in names])
+        weights = np.where(np.isnan(prior), weights, (weights + prior) / 2)
         
         # Normalize final weights
-        total_weight = sum(self.weights.values())
-        for name in self.weights:
-            self.weights[name] /= total_weight
+        weights /= weights.sum()
+        
+        self.weights = dict(zip(names, weights.tolist()))
+        self._weight_vector = None
+    
+    def _compile_predictors(self):
+        """
+        Bind the native prediction entry point of each trained booster
+        
+        The sklearn wrappers validate input and rebuild internal matrices on
+        every call; the boosters can predict directly from a NumPy array.
+        Models without a native entry point fall back to their own predict.
+        
+        Since all models predict at the same time, each booster is limited
+        to its share of the CPU cores to avoid oversubscription. Chunked
+        prediction parallelizes over rows instead, and single rows are
+        predicted serially, so both use single-threaded predictors.
+        """
+        self._predictors = {}
+        self._chunk_predictors = {}
+        threads = max(1, (os.cpu_count() or 1) // len(self.models))
+        
+        if 'xgboost' in self.models:
+            booster = self.models['xgboost'].get_booster()
+            booster.set_param({'nthread': threads})
+            self._predictors['xgboost'] = booster.inplace_predict
+            
+            # nthread is a booster parameter, so the chunk path needs its own copy
+            single_thread = booster.copy()
+            single_thread.set_param({'nthread': 1})
+            self._chunk_predictors['xgboost'] = single_thread.inplace_predict
+        
+        if 'lightgbm' in self.models:
+            booster = self.models['lightgbm'].booster_
+            self._predictors['lightgbm'] = partial(booster.predict, num_threads=threads)
+            self._chunk_predictors['lightgbm'] = partial(booster.predict, num_threads=1)
+        
+        if 'catboost' in self.models:
+            model = self.models['catboost']
+            self._predictors['catboost'] = partial(model.predict, thread_count=threads)
+            self._chunk_predictors['catboost'] = partial(model.predict, thread_count=1)
+        
+        if 'random_forest' in self.models:
+            # The forest reads n_jobs when predicting, so the chunk path uses
+            # a shallow copy that shares the fitted trees. Gradient boosting
+            # always predicts on the calling thread.
+            single_thread = copy.copy(self.models['random_forest'])
+            single_thread.n_jobs = 1
+            self._chunk_predictors['random_forest'] = single_thread.predict
     
     def predict(self, X: pd.DataFrame) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
         """
         Make ensemble prediction
         
+        The individual predictions are row views into a single matrix
+        allocated for this call, so results from earlier calls stay valid
+        and concurrent calls never share output memory.
+        
         Args:
             X: Feature dataframe
             
         Returns:
             Tuple of (ensemble_prediction, individual_predictions)
         """
+        predictions = self._predict_models(X)
+
+        # Weighted sum over models in a single matrix-vector product; the
+        # weight vector is built once per weight update
+        if self._weight_vector is None:
+            self._weight_vector = np.array([self.weights[name] for name in self.models], dtype=np.float32)
+        ensemble_prediction = self._weight_vector @ predictions
+
+        # Individual predictions are views into the prediction matrix
+        individual_predictions = dict(zip(self.models, predictions))
+
+        # Apply post-processing
+        ensemble_prediction = self._post_process_predictions(ensemble_prediction)
+        
+        return ensemble_prediction, individual_predictions
+    
+    def _predict_models(self, X: pd.DataFrame) -> np.ndarray:
+        """
+        Predict with every base model
+        
+        Args:
+            X: Feature dataframe
+            
+        Returns:
+            (n_models, n_rows) float32 prediction matrix
+        """
         # Preprocess input data
-        X_processed = self._feature_engineering(X)
-        X_scaled = self.scalers['standard'].transform(X_processed)
+        X_processed = self._feature_engineering(self._impute_missing(X))
+        X_scaled = self._scale_features(X_processed)
+
+        # Collect predictions into one (n_models, n_rows) matrix
+        predictions = np.empty((len(self.models), len(X_scaled)), dtype=np.float32)
+        
+        if len(X_scaled) == 1:
+            # Thread dispatch costs more than predicting one row serially
+            for i, (name, model) in enumerate(self.models.items()):
+                predictions[i] = self._chunk_predictors.get(name, model.predict)(X_scaled)
+        elif len(X_scaled) >= self.config['inference']['chunk_min_rows']:
+            self._predict_chunked(X_scaled, predictions)
+        else:
+            # Run all models concurrently
+            futures = [
+                self._executor.submit(self._predictors.get(name, model.predict), X_scaled)
+                for name, model in self.models.items()
+            ]
+            for i, future in enumerate(futures):
+                predictions[i] = future.result()
         
-        individual_predictions = {}
-        ensemble_prediction = np.zeros(len(X_scaled))
+        return predictions
+    
+    def online_predict(self, observation: Dict[str, float]) -> float:
+        """
+        Make an ensemble prediction for a single observation
         
-        # Get predictions from each model
-        for name, model in self.models.items():
-            pred = model.predict(X_scaled)
-            individual_predictions[name] = pred
-            ensemble_prediction += self.weights[name] * pred
+        Args:
+            observation: Raw feature values keyed by feature name
+            
+        Returns:
+            Predicted sardine density
+        """
+        ensemble_prediction, _ = self.predict(pd.DataFrame([observation]))
+        return float(ensemble_prediction[0])
+    
+    def _predict_chunked(self, X_scaled: np.ndarray, predictions: np.ndarray):
+        """
+        Predict a large batch as row chunks spread over all CPU cores
         
-        # Apply post-processing
-        ensemble_prediction = self._post_process_predictions(ensemble_prediction)
+        Small batches are fastest with each model parallelizing over its
+        trees; past a few thousand rows, single-threaded predictions on
+        fixed-size row chunks scale better.
         
-        return ensemble_prediction, individual_predictions
+        Args:
+            X_scaled: Scaled feature array
+            predictions: (n_models, n_rows) array filled in place
+        """
+        chunk_size = self.config['inference']['chunk_size']
+        starts = range(0, len(X_scaled), chunk_size)
+        
+        futures = [
+            (i, start, self._chunk_executor.submit(
+                self._chunk_predictors.get(name, model.predict),
+                X_scaled[start:start + chunk_size]
+            ))
+            for i, (name, model) in enumerate(self.models.items())
+            for start in starts
+        ]
+        for i, start, future in futures:
+            predictions[i, start:start + chunk_size] = future.result()
+    
+    def _scale_features(self, X: pd.DataFrame) -> np.ndarray:
+        """
+        Standardize features with the fitted scaler parameters
+        
+        Equivalent to the scaler's transform, but done in place on a single
+        float32 copy of the frame instead of a float64 copy plus a cast.
+        
+        Args:
+            X: Engineered feature dataframe
+            
+        Returns:
+            Scaled float32 feature array
+        """
+        scaler = self.scalers['standard']
+        
+        # Align columns with the order the scaler was fitted on
+        if not np.array_equal(X.columns, scaler.feature_names_in_):
+            X = X[scaler.feature_names_in_]
+        
+        X_scaled = X.to_numpy(dtype=np.float32, copy=True)
+        X_scaled -= scaler.mean_
+        X_scaled /= scaler.scale_
+        
+        return X_scaled
     
     def _post_process_predictions(self, predictions: np.ndarray) -> np.ndarray:
         """
         Apply post-processing to predictions
         
         Args:
-            predictions: Raw predictions
+            predictions: Raw predictions, one series per row along the last axis
             
         Returns:
             Processed predictions
         """
-        # Ensure non-negative predictions
-        predictions = np.maximum(predictions, 0)
-        
-        # Apply smoothing for temporal consistency
-        if len(predictions) > 1:
-            predictions = np.convolve(predictions, np.ones(3)/3, mode='same')
-        
-        return predictions
+        n = predictions.shape[-1]
+        if n <= 1:
+            # Ensure non-negative predictions
+            return np.maximum(predictions, 0)
+
+        # Apply smoothing for temporal consistency: 3-point moving average
+        # from prefix sums, zero-padded at the edges like mode='same'.
+        # Non-negative predictions are clipped straight into the prefix-sum
+        # buffer and accumulated in place.
+        csum = np.zeros(predictions.shape[:-1] + (n + 3,))
+        prefix = csum[..., 2:n + 2]
+        np.maximum(predictions, 0, out=prefix)
+        np.cumsum(prefix, axis=-1, out=prefix)
+        csum[..., n + 2] = csum[..., n + 1]
+
+        smoothed = csum[..., 3:] - csum[..., :-3]
+        smoothed *= 1.0 / 3.0
+        return smoothed
     
     def predict_with_uncertainty(self, X: pd.DataFrame, n_samples: int = 100) -> Tuple[np.ndarray, np.ndarray]:
         """
         Make predictions with uncertainty estimation
         
+        The base models predict once; each sample then reweights those
+        predictions with ensemble weights drawn from a Dirichlet distribution
+        centred on the current weights, so the spread reflects how much the
+        models disagree on each row.
+        
         Args:
             X: Feature dataframe
-            n_samples: Number of bootstrap samples
+            n_samples: Number of weight samples
             
         Returns:
             Tuple of (mean_prediction, uncertainty)
         """
-        predictions = []
+        predictions = self._predict_models(X)
         
-        for _ in range(n_samples):
-            # Bootstrap sampling
-            idx = np.random.choice(len(X), len(X), replace=True)
-            X_boot = X.iloc[idx]
-            
-            # Make prediction
-            pred, _ = self.predict(X_boot)
-            predictions.append(pred)
+        weights = np.array([self.weights[name] for name in self.models])
+        rng = np.random.default_rng()
+        sampled_weights = rng.dirichlet(self.WEIGHT_CONCENTRATION * weights, size=n_samples)
         
-        predictions = np.array(predictions)
-        mean_prediction = np.mean(predictions, axis=0)
-        uncertainty = np.std(predictions, axis=0)
+        # (n_samples, n_models) @ (n_models, n_rows) in a single product
+        samples = self._post_process_predictions(sampled_weights.astype(np.float32) @ predictions)
+
+        mean_prediction = np.mean(samples, axis=0)
+        uncertainty = np.std(samples, axis=0)
         
         return mean_prediction, uncertainty
     
@@ -421,23 +786,29 @@ class EnsembleSardinePredictor:
         # Make predictions
         ensemble_pred, individual_preds = self.predict(X_test)
         
-        results = {}
-        
-        # Evaluate ensemble
-        results['ensemble'] = {
-            'rmse': np.sqrt(mean_squared_error(y_test, ensemble_pred)),
-            'mae': mean_absolute_error(y_test, ensemble_pred),
-            'r2': r2_score(y_test, ensemble_pred)
+        # Residuals of the ensemble and every model as one (n_models + 1, n_rows) matrix
+        names = ['ensemble', *individual_preds]
+        y_test = np.asarray(y_test, dtype=np.float64)
+        residuals = np.vstack([ensemble_pred, *individual_preds.values()]) - y_test
+        
+        n = len(y_test)
+        ss_res = np.einsum('mn,mn->m', residuals, residuals)
+        mae = np.abs(residuals).sum(axis=1) / n
+        ss_tot = np.sum((y_test - y_test.mean()) ** 2)
+        
+        # A constant target follows sklearn's r2_score: perfect fit is 1, otherwise 0
+        if ss_tot > 0:
+            r2 = 1 - ss_res / ss_tot
+        else:
+            r2 = np.where(ss_res == 0, 1.0, 0.0)
+        
+        results = {
+            name: {'rmse': rmse, 'mae': mae_value, 'r2': r2_value}
+            for name, rmse, mae_value, r2_value in zip(
+                names, np.sqrt(ss_res / n).tolist(), mae.tolist(), r2.tolist()
+            )
         }
         
-        # Evaluate individual models
-        for name, pred in individual_preds.items():
-            results[name] = {
-                'rmse': np.sqrt(mean_squared_error(y_test, pred)),
-                'mae': mean_absolute_error(y_test, pred),
-                'r2': r2_score(y_test, pred)
-            }
-        
         return results
     
     def _save_models(self):
@@ -445,26 +816,42 @@ class EnsembleSardinePredictor:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         
         # Create directories if they don't exist
-        import os
         os.makedirs('models', exist_ok=True)
         os.makedirs('scalers', exist_ok=True)
         
-        # Save models
-        for name, model in self.models.items():
-            model_path = f'models/{name}_{timestamp}.joblib'
-            joblib.dump(model, model_path)
-        
-        # Save scalers
-        for name, scaler in self.scalers.items():
-            scaler_path = f'scalers/{name}_{timestamp}.joblib'
-            joblib.dump(scaler, scaler_path)
-        
-        # Save weights and config
-        with open(f'models/ensemble_weights_{timestamp}.json', 'w') as f:
-            json.dump(self.weights, f)
-        
-        with open(f'models/config_{timestamp}.json', 'w') as f:
-            json.dump(self.config, f)
+        artifacts = [
+            (model, f'models/{name}_{timestamp}.joblib') for name, model in self.models.items()
+        ] + [
+            (scaler, f'scalers/{name}_{timestamp}.joblib') for name, scaler in self.scalers.items()
+        ]
+        
+        # Save models and scalers concurrently, writing weights and config meanwhile
+        with ThreadPoolExecutor(max_workers=len(artifacts)) as executor:
+            futures = [
+                executor.submit(joblib.dump, obj, path, compress=ARTIFACT_COMPRESSION)
+                for obj, path in artifacts
+            ]
+            
+            # Manifest of artifact paths, so loading doesn't depend on naming
+            manifest = {
+                'models': {name: f'models/{name}_{timestamp}.joblib' for name in self.models},
+                'scalers': {name: f'scalers/{name}_{timestamp}.joblib' for name in self.scalers}
+            }
+            with open(f'models/manifest_{timestamp}.json', 'w') as f:
+                json.dump(manifest, f)
+            
+            with open(f'models/ensemble_weights_{timestamp}.json', 'w') as f:
+                json.dump(self.weights, f)
+            
+            with open(f'models/config_{timestamp}.json', 'w') as f:
+                json.dump(self.config, f)
+            
+            if self._feature_medians is not None:
+                with open(f'models/feature_medians_{timestamp}.json', 'w') as f:
+                    json.dump(self._feature_medians.to_dict(), f)
+            
+            for future in futures:
+                future.result()
         
         self.logger.info(f"Models saved with timestamp: {timestamp}")
     
@@ -475,19 +862,37 @@ class EnsembleSardinePredictor:
         Args:
             timestamp: Timestamp of the models to load
         """
-        # Load models
-        for name in self.models.keys():
-            model_path = f'models/{name}_{timestamp}.joblib'
+        # Artifact paths come from the manifest; models saved before it
+        # existed follow the naming convention
+        manifest_path = f'models/manifest_{timestamp}.json'
+        if os.path.exists(manifest_path):
+            with open(manifest_path, 'r') as f:
+                manifest = json.load(f)
+        else:
+            manifest = {
+                'models': {name: f'models/{name}_{timestamp}.joblib' for name in self.models},
+                'scalers': {name: f'scalers/{name}_{timestamp}.joblib' for name in self.scalers}
+            }
+        
+        # Load models and scalers; the compression format is detected on load
+        for name, model_path in manifest['models'].items():
             self.models[name] = joblib.load(model_path)
         
-        # Load scalers
-        for name in self.scalers.keys():
-            scaler_path = f'scalers/{name}_{timestamp}.joblib'
+        for name, scaler_path in manifest['scalers'].items():
             self.scalers[name] = joblib.load(scaler_path)
         
         # Load weights
         with open(f'models/ensemble_weights_{timestamp}.json', 'r') as f:
             self.weights = json.load(f)
+        self._weight_vector = None
+        
+        # Load imputation medians, if saved with these models
+        medians_path = f'models/feature_medians_{timestamp}.json'
+        if os.path.exists(medians_path):
+            with open(medians_path, 'r') as f:
+                self._feature_medians = pd.Series(json.load(f))
+        
+        self._compile_predictors()
         
         self.logger.info(f"Models loaded with timestamp: {timestamp}")
     
@@ -495,11 +900,41 @@ class EnsembleSardinePredictor:
         """
         Get feature importance from all models
         
+        Importances are stored as float16 views into a shared matrix;
+        cast them with astype if more precision is needed.
+        
         Returns:
             Dictionary of feature importance by model
         """
         return self.feature_importance
     
+    def get_ensemble_feature_importance(self) -> Dict[str, float]:
+        """
+        Get feature importance of the ensemble as a whole
+        
+        Each model's importances are normalized to sum to one, since the
+        libraries report them on different scales, then weighted by its
+        ensemble weight in one average over the stacked importance matrix.
+        Models without importances are left out and the remaining weights
+        renormalized.
+        
+        Returns:
+            Dictionary of weighted importance by feature, in training order
+        """
+        if not self.feature_importance or 'standard' not in self.scalers:
+            return {}
+        
+        names = list(self.feature_importance)
+        importances = np.vstack([self.feature_importance[name] for name in names]).astype(np.float32)
+        totals = importances.sum(axis=1, keepdims=True)
+        np.divide(importances, totals, out=importances, where=totals > 0)
+        weights = np.array([self.weights.get(name, 0.0) for name in names], dtype=np.float32)
+        if not weights.any():
+            weights = None
+        
+        aggregated = np.average(importances, axis=0, weights=weights)
+        return dict(zip(self.scalers['standard'].feature_names_in_, aggregated.tolist()))
+    
     def get_model_weights(self) -> Dict[str, float]:
         """
         Get ensemble model weights
@@ -534,6 +969,41 @@ class EnsembleSardinePredictor:
         self.logger.info("Ensemble weights updated successfully!")
 
 
+def _train_model(model, X: np.ndarray, y: np.ndarray, cv, n_threads: int,
+                 fit_params: Dict[str, Any]) -> Tuple[Any, np.ndarray]:
+    """
+    Cross-validate and fit a single base model in a worker process
+    
+    Args:
+        model: Unfitted model
+        X: Scaled training features
+        y: Training target
+        cv: Cross-validation splitter
+        n_threads: Threads the model may use internally
+        fit_params: Extra keyword arguments for the model's fit
+        
+    Returns:
+        Tuple of (fitted_model, cv_scores)
+    """
+    if 'n_jobs' in model.get_params():
+        model.set_params(n_jobs=n_threads)
+    elif isinstance(model, cb.CatBoostRegressor):
+        model.set_params(thread_count=n_threads)
+    
+    # Cross-validation
+    cv_scores = cross_val_score(
+        model, X, y,
+        cv=cv,
+        scoring='neg_mean_squared_error',
+        params=fit_params
+    )
+    
+    # Train on full dataset
+    model.fit(X, y, **fit_params)
+    
+    return model, cv_scores
+
+
 def main():
     """
     Main function to demonstrate ensemble prediction system
@@ -22,15 +22,15 @@ class TestEnsembleSardinePredictor:
         self.predictor = EnsembleSardinePredictor()
         
         # Create sample data
-        np.random.seed(42)
+        self.rng = np.random.default_rng(42)
         self.sample_data = pd.DataFrame({
-            'sea_surface_temp': np.random.normal(18, 2, 100),
-            'chlorophyll': np.random.lognormal(0, 0.5, 100),
-            'depth': np.random.uniform(10, 200, 100),
-            'salinity': np.random.normal(34.5, 0.5, 100),
-            'current_speed': np.random.exponential(0.5, 100),
-            'month': np.random.randint(1, 13, 100),
-            'sardine_density': np.random.gamma(2, 0.5, 100),
+            'sea_surface_temp': self.rng.normal(18, 2, 100),
+            'chlorophyll': self.rng.lognormal(0, 0.5, 100),
+            'depth': self.rng.uniform(10, 200, 100),
+            'salinity': self.rng.normal(34.5, 0.5, 100),
+            'current_speed': self.rng.exponential(0.5, 100),
+            'month': self.rng.integers(1, 13, 100),
+            'sardine_density': self.rng.gamma(2, 0.5, 100),
             'timestamp': pd.date_range('2023-01-01', periods=100, freq='D')
         })
 
@@ -58,6 +58,28 @@ class TestEnsembleSardinePredictor:
         assert 'chlorophyll' in X_enhanced.columns
         assert 'depth' in X_enhanced.columns
 
+    def test_feature_engineering_does_not_mutate_input(self):
+        """Test that feature engineering leaves the input dataframe untouched"""
+        X = self.sample_data.drop(['sardine_density', 'timestamp'], axis=1)
+        original_columns = list(X.columns)
+
+        X_enhanced = self.predictor._feature_engineering(X)
+
+        assert list(X.columns) == original_columns
+        assert len(X_enhanced.columns) > len(original_columns)
+        np.testing.assert_allclose(X_enhanced['temp_squared'], X['sea_surface_temp'] ** 2, rtol=1e-6)
+
+    def test_feature_engineering_cache(self):
+        """Test that engineered features are reused only for identical inputs"""
+        X = self.sample_data.drop(['sardine_density', 'timestamp'], axis=1)
+
+        first = self.predictor._feature_engineering(X)
+        assert self.predictor._feature_engineering(X.copy()) is first
+
+        X_changed = X.copy()
+        X_changed.loc[0, 'sea_surface_temp'] += 1.0
+        assert self.predictor._feature_engineering(X_changed) is not first
+
     def test_preprocess_data(self):
         """Test data preprocessing"""
         X, y = self.predictor.preprocess_data(self.sample_data)
@@ -67,6 +89,29 @@ class TestEnsembleSardinePredictor:
         assert not np.isnan(X).any()
         assert not np.isnan(y).any()
 
+    def test_preprocess_data_cache(self):
+        """Test that preprocessing the same frame reuses the cached result"""
+        X, y = self.predictor.preprocess_data(self.sample_data)
+        scaler = self.predictor.scalers['standard']
+
+        other = self.sample_data.copy()
+        other['sea_surface_temp'] += 1.0
+        self.predictor.preprocess_data(other)
+        assert self.predictor.scalers['standard'] is not scaler
+
+        X_cached, y_cached = self.predictor.preprocess_data(self.sample_data.copy())
+        assert X_cached is X
+        assert y_cached is y
+        assert self.predictor.scalers['standard'] is scaler
+        assert self.predictor._cache_stats == {'hits': 1, 'misses': 2}
+
+    def test_categorical_features_are_not_scaled(self):
+        """Test that categorical features keep their raw codes after scaling"""
+        X, _ = self.predictor.preprocess_data(self.sample_data)
+
+        columns = list(self.predictor.scalers['standard'].feature_names_in_)
+        np.testing.assert_array_equal(X[:, columns.index('month')], self.sample_data['month'])
+
     def test_train_models(self):
         """Test model training"""
         results = self.predictor.train_models(self.sample_data)
@@ -95,6 +140,35 @@ class TestEnsembleSardinePredictor:
         assert len(individual_preds) == len(self.predictor.models)
         assert all(pred >= 0 for pred in ensemble_pred)  # Non-negative predictions
 
+    def test_chunked_predict_matches_single_batch(self):
+        """Test that chunked prediction of large batches gives the same results"""
+        self.predictor.train_models(self.sample_data)
+        test_data = self.sample_data.drop(['sardine_density', 'timestamp'], axis=1)
+
+        expected, expected_individual = self.predictor.predict(test_data)
+
+        self.predictor.config['inference'] = {'chunk_size': 16, 'chunk_min_rows': 50}
+        chunked, chunked_individual = self.predictor.predict(test_data)
+
+        np.testing.assert_allclose(chunked, expected, rtol=1e-5)
+        for name in expected_individual:
+            np.testing.assert_allclose(chunked_individual[name], expected_individual[name], rtol=1e-5)
+
+    def test_online_predict_single_row(self):
+        """Test the single-row prediction path against batch predictions"""
+        self.predictor.train_models(self.sample_data)
+        test_data = self.sample_data.drop(['sardine_density', 'timestamp'], axis=1).head(5)
+
+        _, batch_individual = self.predictor.predict(test_data)
+        _, row_individual = self.predictor.predict(test_data.iloc[[2]])
+
+        for name in batch_individual:
+            np.testing.assert_allclose(row_individual[name], batch_individual[name][[2]], rtol=1e-5)
+
+        prediction = self.predictor.online_predict(test_data.iloc[2].to_dict())
+        assert isinstance(prediction, float)
+        assert prediction >= 0
+
     def test_predict_with_uncertainty(self):
         """Test prediction with uncertainty estimation"""
         # Train models first
@@ -127,6 +201,23 @@ class TestEnsembleSardinePredictor:
         assert results['ensemble']['r2'] <= 1
         assert results['ensemble']['r2'] >= -1
 
+    def test_evaluate_models_matches_sklearn_metrics(self):
+        """Test vectorized evaluation against sklearn metrics"""
+        from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
+
+        rng = np.random.default_rng(0)
+        y_test = rng.uniform(0, 100, 30)
+        ensemble_pred = y_test + rng.normal(0, 5, 30)
+        individual_preds = {name: y_test + rng.normal(0, 10, 30) for name in self.predictor.models}
+
+        with patch.object(self.predictor, 'predict', return_value=(ensemble_pred, individual_preds)):
+            results = self.predictor.evaluate_models(pd.DataFrame(), y_test)
+
+        for name, pred in [('ensemble', ensemble_pred), *individual_preds.items()]:
+            assert np.isclose(results[name]['rmse'], np.sqrt(mean_squared_error(y_test, pred)))
+            assert np.isclose(results[name]['mae'], mean_absolute_error(y_test, pred))
+            assert np.isclose(results[name]['r2'], r2_score(y_test, pred))
+
     def test_feature_importance(self):
         """Test feature importance extraction"""
         # Train models first
@@ -137,6 +228,22 @@ class TestEnsembleSardinePredictor:
         
         assert isinstance(importance, dict)
         assert len(importance) > 0
+        assert all(values.dtype == np.float16 for values in importance.values())
+        
+        # Ensemble importance is the weighted average of normalized importances
+        aggregated = self.predictor.get_ensemble_feature_importance()
+        features = self.predictor.scalers['standard'].feature_names_in_
+        assert list(aggregated) == list(features)
+        
+        expected = np.zeros(len(features))
+        total_weight = 0.0
+        for name, values in importance.items():
+            values = values.astype(np.float64)
+            weight = self.predictor.weights[name]
+            expected += weight * values / values.sum()
+            total_weight += weight
+        np.testing.assert_allclose(list(aggregated.values()), expected / total_weight, rtol=1e-3)
+        assert np.isclose(sum(aggregated.values()), 1.0, rtol=1e-3)
 
     def test_model_weights(self):
         """Test model weight management"""
@@ -213,6 +320,24 @@ class TestEnsembleSardinePredictor:
         assert all(pred >= 0 for pred in processed)
         assert len(processed) == len(raw_predictions)
 
+    def test_post_process_smoothing_matches_convolution(self):
+        """Test prefix-sum smoothing against a zero-padded 3-point convolution"""
+        raw_predictions = self.rng.normal(1.0, 0.5, 50)
+
+        for n in (3, 4, 50):
+            processed = self.predictor._post_process_predictions(raw_predictions[:n])
+            expected = np.convolve(np.maximum(raw_predictions[:n], 0), np.ones(3) / 3, mode='same')
+            np.testing.assert_allclose(processed, expected)
+
+    def test_post_process_predictions_row_wise(self):
+        """Test that a matrix of prediction series is processed row by row"""
+        raw_predictions = self.rng.normal(1.0, 0.5, (4, 20))
+
+        processed = self.predictor._post_process_predictions(raw_predictions)
+
+        for row, raw in zip(processed, raw_predictions):
+            np.testing.assert_allclose(row, self.predictor._post_process_predictions(raw))
+
     def test_calculate_ensemble_weights(self):
         """Test ensemble weight calculation"""
         mock_results = {
@@ -227,6 +352,34 @@ class TestEnsembleSardinePredictor:
         assert abs(sum(weights.values()) - 1.0) < 0.01
         assert weights['model1'] > weights['model2']  # Lower RMSE should get higher weight
 
+    def test_calculate_ensemble_weights_zero_rmse(self):
+        """Test that a perfect model does not produce invalid weights"""
+        self.predictor.config['ensemble'] = {}
+        mock_results = {
+            'model1': {'cv_rmse': 0.0},
+            'model2': {'cv_rmse': 0.2}
+        }
+
+        self.predictor._calculate_ensemble_weights(mock_results)
+
+        weights = self.predictor.weights
+        assert all(np.isfinite(w) for w in weights.values())
+        assert weights['model1'] > 0.99
+
+    def test_calculate_ensemble_weights_uses_config_prior(self):
+        """Test that configured ensemble weights are blended into performance weights"""
+        mock_results = {
+            'xgboost': {'cv_rmse': 0.1},
+            'lightgbm': {'cv_rmse': 0.1}
+        }
+        self.predictor.config['ensemble'] = {'xgboost_weight': 0.9, 'lightgbm_weight': 0.1}
+
+        self.predictor._calculate_ensemble_weights(mock_results)
+
+        weights = self.predictor.weights
+        assert abs(weights['xgboost'] - 0.7) < 1e-9
+        assert abs(weights['lightgbm'] - 0.3) < 1e-9
+
     def test_missing_value_handling(self):
         """Test handling of missing values"""
         # Create data with missing values
@@ -235,10 +388,23 @@ class TestEnsembleSardinePredictor:
         data_with_missing.loc[1, 'chlorophyll'] = np.nan
         
         X, y = self.predictor.preprocess_data(data_with_missing)
-        
+
         assert not np.isnan(X).any()
         assert not np.isnan(y).any()
 
+    def test_missing_value_imputation_uses_training_medians(self):
+        """Test that inference-time imputation reuses the medians from preprocessing"""
+        self.predictor.preprocess_data(self.sample_data)
+        training_median = self.sample_data['sea_surface_temp'].median()
+
+        X_new = self.sample_data.drop(['sardine_density', 'timestamp'], axis=1).head(3).copy()
+        X_new.loc[X_new.index[0], 'sea_surface_temp'] = np.nan
+
+        imputed = self.predictor._impute_missing(X_new)
+
+        assert imputed['sea_surface_temp'].iloc[0] == training_median
+        assert self.predictor._impute_missing(imputed) is imputed
+
     def test_edge_cases(self):
         """Test edge cases"""
         # Test with empty data
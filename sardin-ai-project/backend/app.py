@@ -3,29 +3,21 @@
 # SARDIN-AI Main Application Entry Point
 import os
 import sys
+import importlib
 import click
 from app import create_app
-from app.services.ai_service import AIService
-from app.services.noaa_service import NOAAService
-from app.services.cicese_service import CICESEService
-from app.services.prediction_service import PredictionService
-from app.services.report_service import ReportService
 
 # Initialize Flask app
 app = create_app(os.environ.get('FLASK_ENV', 'development'))
 
-# Initialize services
-ai_service = AIService()
-noaa_service = NOAAService()
-cicese_service = CICESEService()
-prediction_service = PredictionService()
-report_service = ReportService()
+# Services are imported inside the commands that use them, so commands
+# such as init_db don't pay for loading the ML and HTTP client stacks
 
 @app.cli.command()
 def init_db():
     """Initialize the database with tables"""
     from app import db
-    from app.models import *
+    from app import models  # registers the model tables with SQLAlchemy
     
     click.echo("Creating database tables...")
     db.create_all()
@@ -34,6 +26,12 @@ def init_db():
 @app.cli.command()
 def test_services():
     """Test all services"""
+    from app.services.ai_service import AIService
+    from app.services.noaa_service import NOAAService
+    from app.services.cicese_service import CICESEService
+    from app.services.prediction_service import PredictionService
+    from app.services.report_service import ReportService
+    
     click.echo("Testing services...")
     
     # Test AI Service
@@ -42,35 +40,35 @@ def test_services():
             {"author": "user1", "content": "Hello, how are you?"},
             {"author": "user2", "content": "I'm doing great, thanks!"}
         ]
-        sentiment_result = ai_service.analyze_sentiment(chat_data)
+        sentiment_result = AIService().analyze_sentiment(chat_data)
         click.echo(f"AI Service - Sentiment Analysis: {sentiment_result['sentiment_category']}")
     except Exception as e:
         click.echo(f"AI Service Error: {e}")
     
     # Test NOAA Service
     try:
-        noaa_data = noaa_service.get_ocean_data(32.5, -117.5)
+        noaa_data = NOAAService().get_ocean_data(32.5, -117.5)
         click.echo(f"NOAA Service - Temperature: {noaa_data.get('temperature', 'N/A')}°C")
     except Exception as e:
         click.echo(f"NOAA Service Error: {e}")
     
     # Test CICESE Service
     try:
-        cicese_data = cicese_service.get_ocean_data(32.5, -117.5)
+        cicese_data = CICESEService().get_ocean_data(32.5, -117.5)
         click.echo(f"CICESE Service - Temperature: {cicese_data.get('temperature', 'N/A')}°C")
     except Exception as e:
         click.echo(f"CICESE Service Error: {e}")
     
     # Test Prediction Service
     try:
-        prediction = prediction_service.predict_fish_location("sardina", 32.5, -117.5)
+        prediction = PredictionService().predict_fish_location("sardina", 32.5, -117.5)
         click.echo(f"Prediction Service - Probability: {prediction['probability']}")
     except Exception as e:
         click.echo(f"Prediction Service Error: {e}")
     
     # Test Report Service
     try:
-        markdown_report = report_service.generate_markdown_report("Test Report", {"test": "data"})
+        markdown_report = ReportService().generate_markdown_report("Test Report", {"test": "data"})
         click.echo(f"Report Service - Generated markdown report")
     except Exception as e:
         click.echo(f"Report Service Error: {e}")
@@ -84,7 +82,8 @@ def test_services():
 def predict(species, lat, lon):
     """Generate fish prediction for given location"""
     try:
-        prediction = prediction_service.predict_fish_location(species, lat, lon)
+        from app.services.prediction_service import PredictionService
+        prediction = PredictionService().predict_fish_location(species, lat, lon)
         click.echo(f"Prediction for {species} at ({lat}, {lon}):")
         click.echo(f"  Probability: {prediction['probability']}")
         click.echo(f"  Confidence: {prediction['confidence_interval']}")
@@ -98,9 +97,11 @@ def predict(species, lat, lon):
 def generate_report(format, title):
     """Generate a sample report"""
     try:
+        from app.services.report_service import ReportService
+        report_service = ReportService()
         if format == 'markdown':
-            content = report_service.generate_markdown_report(title, {"test": "data"})
-            filename = report_service.save_markdown_report(content, "sample_report")
+            sections = report_service.iter_report_sections(title, {"test": "data"})
+            filename = report_service.save_markdown_report(sections, "sample_report")
             click.echo(f"Markdown report saved to: {filename}")
         else:
             content = report_service.generate_markdown_report(title, {"test": "data"})
@@ -118,27 +119,28 @@ def health_check():
     # Check database connection
     try:
         from app import db
-        db.engine.execute("SELECT 1")
+        from sqlalchemy import text
+        with db.engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
         click.echo("✅ Database: Connected")
     except Exception as e:
         click.echo(f"❌ Database: {e}")
     
     # Check services
     services = [
-        ("AI Service", ai_service),
-        ("NOAA Service", noaa_service),
-        ("CICESE Service", cicese_service),
-        ("Prediction Service", prediction_service),
-        ("Report Service", report_service)
+        ("AI Service", 'app.services.ai_service', 'AIService'),
+        ("NOAA Service", 'app.services.noaa_service', 'NOAAService'),
+        ("CICESE Service", 'app.services.cicese_service', 'CICESEService'),
+        ("Prediction Service", 'app.services.prediction_service', 'PredictionService'),
+        ("Report Service", 'app.services.report_service', 'ReportService')
     ]
     
-    for service_name, service in services:
+    for service_name, module_name, class_name in services:
         try:
-            # Simple test - just check if service can be instantiated
-            if hasattr(service, '__class__'):
-                click.echo(f"✅ {service_name}: OK")
-            else:
-                click.echo(f"❌ {service_name}: Not properly initialized")
+            # Simple test - just check if service can be imported and instantiated
+            service_class = getattr(importlib.import_module(module_name), class_name)
+            service_class()
+            click.echo(f"✅ {service_name}: OK")
         except Exception as e:
             click.echo(f"❌ {service_name}: {e}")
     
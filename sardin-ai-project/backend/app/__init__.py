@@ -5,9 +5,11 @@ from flask_cors import CORS
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from flask_caching import Cache
-from supabase import create_client
-import redis
+from flask_compress import Compress
+from sqlalchemy import text
+from app.utils import json_utils
 import os
+import threading
 
 # Initialize extensions
 db = SQLAlchemy()
@@ -18,14 +20,75 @@ limiter = Limiter(
     default_limits=["200 per day", "50 per hour"]
 )
 cache = Cache()
+compress = Compress()
 
-# Initialize Supabase
-supabase_url = os.environ.get('SUPABASE_URL')
-supabase_key = os.environ.get('SUPABASE_KEY')
-supabase = create_client(supabase_url, supabase_key)
+# Supabase and Redis clients are created on first use, so importing the
+# package (e.g. for CLI commands) doesn't connect to either
+_supabase = None
+_redis_client = None
 
-# Initialize Redis
-redis_client = redis.from_url(os.environ.get('REDIS_URL', 'redis://localhost:6379/0'))
+def get_supabase():
+    """Return the shared Supabase client"""
+    global _supabase
+    if _supabase is None:
+        from supabase import create_client
+        _supabase = create_client(os.environ.get('SUPABASE_URL'), os.environ.get('SUPABASE_KEY'))
+    return _supabase
+
+# Cap on pooled Redis connections, so bursts queue instead of exhausting sockets
+REDIS_MAX_CONNECTIONS = 50
+
+def get_redis():
+    """Return the shared Redis client"""
+    global _redis_client
+    if _redis_client is None:
+        import redis
+        pool = redis.ConnectionPool.from_url(
+            os.environ.get('REDIS_URL', 'redis://localhost:6379/0'),
+            max_connections=REDIS_MAX_CONNECTIONS,
+            health_check_interval=30
+        )
+        _redis_client = redis.Redis(connection_pool=pool)
+    return _redis_client
+
+# Service objects are stateless between calls, so one instance of each is
+# shared by every request in the process instead of being rebuilt per request
+_services = {}
+_services_lock = threading.Lock()
+
+def get_service(service_class):
+    """Return the shared instance of a service class, creating it on first use"""
+    service = _services.get(service_class)
+    if service is None:
+        with _services_lock:
+            service = _services.get(service_class)
+            if service is None:
+                service = _services[service_class] = service_class()
+    return service
+
+def rcache_get(key):
+    """Return the cached object stored under key, or None"""
+    payload = get_redis().get(key)
+    return json_utils.loads(payload) if payload is not None else None
+
+def rcache_set(key, obj, ex=None):
+    """Cache a JSON-serializable object under key, expiring after ex seconds"""
+    get_redis().set(key, json_utils.dumps(obj), ex=ex)
+
+def celery_init_app(app):
+    """Create the Celery app whose tasks run inside a Flask app context"""
+    from celery import Celery, Task
+    
+    class FlaskTask(Task):
+        def __call__(self, *args, **kwargs):
+            with app.app_context():
+                return self.run(*args, **kwargs)
+    
+    celery_app = Celery(app.name, task_cls=FlaskTask)
+    celery_app.config_from_object(app.config['CELERY'])
+    celery_app.set_default()
+    app.extensions['celery'] = celery_app
+    return celery_app
 
 def create_app(config_name='default'):
     app = Flask(__name__)
@@ -34,12 +97,25 @@ def create_app(config_name='default'):
     from config import config
     app.config.from_object(config[config_name])
     
+    # Serialize jsonify() responses with orjson when it is available
+    if json_utils.orjson is not None:
+        app.json = json_utils.ORJSONProvider(app)
+    
     # Initialize extensions with app
     db.init_app(app)
     jwt.init_app(app)
     cors.init_app(app)
     limiter.init_app(app)
     cache.init_app(app)
+    compress.init_app(app)
+    celery_init_app(app)
+    
+    # Open one pooled connection up front so the first request doesn't pay for it
+    with app.app_context():
+        try:
+            db.engine.connect().close()
+        except Exception as e:
+            app.logger.warning(f"Could not pre-warm database pool: {e}")
     
     # Register blueprints
     from app.routes.auth import auth_bp
@@ -67,9 +143,18 @@ def create_app(config_name='default'):
     def rate_limit_exceeded(error):
         return {'error': 'Rate limit exceeded'}, 429
     
-    # Health check endpoint
+    # Health check endpoint; the database ping is cached so frequent probes
+    # don't tie up pooled connections
     @app.route('/health')
+    @cache.cached(timeout=5)
     def health_check():
-        return {'status': 'healthy', 'service': 'SARDIN-AI Backend'}
+        try:
+            with db.engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
+            database = 'connected'
+        except Exception:
+            database = 'unavailable'
+        
+        return {'status': 'healthy', 'service': 'SARDIN-AI Backend', 'database': database}
     
     return app
\ No newline at end of file
@@ -0,0 +1,14 @@
+# Celery worker entry point: celery -A app.celery worker
+import os
+from celery.signals import worker_process_init
+from app import create_app, db
+from app import tasks  # registers the task modules with the worker
+
+flask_app = create_app(os.environ.get('FLASK_ENV', 'production'))
+celery = flask_app.extensions['celery']
+
+@worker_process_init.connect
+def reset_db_pool(**kwargs):
+    """Drop the database connections a prefork child inherited from the parent"""
+    with flask_app.app_context():
+        db.engine.dispose(close=False)
@@ -1,8 +1,79 @@
 from datetime import datetime
+from operator import attrgetter
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import DDL, event, insert, select
+from sqlalchemy.dialects.postgresql import JSONB
 from app import db
 
-class User(db.Model):
+# JSON documents are stored as JSONB on PostgreSQL and plain JSON elsewhere;
+# either way they load as Python objects without a json.loads per row
+JSONDocument = db.JSON().with_variant(JSONB(), 'postgresql')
+
+class SerializerMixin:
+    """
+    Serializes the columns named in _json_fields to a dict, rendering the
+    ones in _datetime_fields as ISO 8601 strings. All fields are read with
+    a single attrgetter built once per model.
+    
+    List endpoints can skip ORM instances entirely: json_select() selects
+    just those columns (json_columns() lists them, e.g. for RETURNING),
+    and row_to_dict() serializes the resulting rows to the same shape as
+    to_dict().
+    """
+    _json_fields = ()
+    _datetime_fields = ()
+    
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._json_getter = attrgetter(*cls._json_fields)
+    
+    @classmethod
+    def _serialize(cls, values):
+        data = dict(zip(cls._json_fields, values))
+        for field in cls._datetime_fields:
+            value = data[field]
+            data[field] = value.isoformat() if value is not None else None
+        return data
+    
+    def to_dict(self):
+        return self._serialize(self._json_getter(self))
+    
+    @classmethod
+    def json_columns(cls):
+        """The serialized columns, in _json_fields order"""
+        return [getattr(cls, field) for field in cls._json_fields]
+    
+    @classmethod
+    def json_select(cls):
+        """Core SELECT of the serialized columns, in _json_fields order"""
+        return select(*cls.json_columns())
+    
+    @classmethod
+    def row_to_dict(cls, row):
+        """Serialize a row returned by json_select(), or by RETURNING json_columns()"""
+        return cls._serialize(row)
+
+class BulkInsertMixin:
+    """
+    Inserts many rows through executemany batches instead of adding and
+    flushing one ORM object at a time
+    """
+    BULK_INSERT_CHUNK_SIZE = 1000
+    
+    @classmethod
+    def bulk_insert(cls, rows):
+        """
+        Insert row dicts in chunks; the caller commits
+        
+        Returns the created objects in the order of rows, loaded through RETURNING
+        """
+        created = []
+        for start in range(0, len(rows), cls.BULK_INSERT_CHUNK_SIZE):
+            chunk = rows[start:start + cls.BULK_INSERT_CHUNK_SIZE]
+            created.extend(db.session.scalars(insert(cls).returning(cls, sort_by_parameter_order=True), chunk))
+        return created
+
+class User(SerializerMixin, db.Model):
     __tablename__ = 'users'
     
     id = db.Column(db.Integer, primary_key=True)
@@ -19,59 +90,60 @@ class User(db.Model):
     ocean_data = db.relationship('OceanData', backref='user', lazy=True)
     fish_predictions = db.relationship('FishPrediction', backref='user', lazy=True)
     
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'username': self.username,
-            'email': self.email,
-            'created_at': self.created_at.isoformat(),
-            'role': self.role,
-            'is_active': self.is_active
-        }
+    _json_fields = ('id', 'username', 'email', 'created_at', 'role', 'is_active')
+    _datetime_fields = ('created_at',)
 
-class ChatSession(db.Model):
+class ChatSession(SerializerMixin, db.Model):
     __tablename__ = 'chat_sessions'
+    __table_args__ = (
+        db.Index('idx_chat_sessions_user_created_id', 'user_id', db.desc('created_at'), db.desc('id')),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     title = db.Column(db.String(200), nullable=False)
-    chat_data = db.Column(db.Text, nullable=False)  # JSON string
+    chat_data = db.Column(JSONDocument, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # Relationships
-    analysis_results = db.relationship('ChatAnalysis', backref='chat_session', lazy=True)
+    analysis_results = db.relationship('ChatAnalysis', backref='chat_session', lazy=True, passive_deletes=True)
     
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'user_id': self.user_id,
-            'title': self.title,
-            'chat_data': self.chat_data,
-            'created_at': self.created_at.isoformat()
-        }
+    _json_fields = ('id', 'user_id', 'title', 'chat_data', 'created_at')
+    _datetime_fields = ('created_at',)
 
-class ChatAnalysis(db.Model):
+class ChatAnalysis(SerializerMixin, db.Model):
     __tablename__ = 'chat_analysis'
+    __table_args__ = (
+        db.Index('idx_chat_analysis_result_data', 'result_data', postgresql_using='gin'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
-    chat_session_id = db.Column(db.Integer, db.ForeignKey('chat_sessions.id'), nullable=False)
-    analysis_type = db.Column(db.String(50), nullable=False)  # sentiment, topics, summary
-    result_data = db.Column(db.Text, nullable=False)  # JSON string
+    chat_session_id = db.Column(db.Integer, db.ForeignKey('chat_sessions.id', ondelete='CASCADE'), nullable=False)
+    analysis_type = db.Column(db.String(50), nullable=False)  # sentiment, topics, summary, all
+    result_data = db.Column(JSONDocument, nullable=False)
     confidence_score = db.Column(db.Float, default=0.0)
+    status = db.Column(db.String(20), nullable=False, default='done')  # pending, running, done, failed
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'chat_session_id': self.chat_session_id,
-            'analysis_type': self.analysis_type,
-            'result_data': self.result_data,
-            'confidence_score': self.confidence_score,
-            'created_at': self.created_at.isoformat()
-        }
+    _json_fields = (
+        'id', 'chat_session_id', 'analysis_type', 'result_data',
+        'confidence_score', 'status', 'created_at'
+    )
+    _datetime_fields = ('created_at',)
 
-class OceanData(db.Model):
+class OceanData(BulkInsertMixin, SerializerMixin, db.Model):
     __tablename__ = 'ocean_data'
+    __table_args__ = (
+        db.Index('idx_ocean_data_location_timestamp', 'latitude', 'longitude', 'timestamp'),
+        db.Index('idx_ocean_data_user_timestamp_id', 'user_id', db.desc('timestamp'), db.desc('id')),
+        db.Index('idx_ocean_data_source_timestamp', 'data_source', db.desc('timestamp')),
+        # Trigram index so location.contains() filters avoid a sequential scan
+        db.Index(
+            'idx_ocean_data_location_trgm', 'location',
+            postgresql_using='gin',
+            postgresql_ops={'location': 'gin_trgm_ops'}
+        ),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
@@ -87,25 +159,26 @@ class OceanData(db.Model):
     data_source = db.Column(db.String(50), default='noaa')  # noaa, cicese, user_input
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
     
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'user_id': self.user_id,
-            'location': self.location,
-            'latitude': self.latitude,
-            'longitude': self.longitude,
-            'temperature': self.temperature,
-            'chlorophyll': self.chlorophyll,
-            'salinity': self.salinity,
-            'current_speed': self.current_speed,
-            'current_direction': self.current_direction,
-            'depth': self.depth,
-            'data_source': self.data_source,
-            'timestamp': self.timestamp.isoformat()
-        }
+    _json_fields = (
+        'id', 'user_id', 'location', 'latitude', 'longitude', 'temperature',
+        'chlorophyll', 'salinity', 'current_speed', 'current_direction',
+        'depth', 'data_source', 'timestamp'
+    )
+    _datetime_fields = ('timestamp',)
 
-class FishPrediction(db.Model):
+class FishPrediction(SerializerMixin, db.Model):
     __tablename__ = 'fish_predictions'
+    __table_args__ = (
+        db.Index('idx_fish_predictions_species_location', 'species', 'latitude', 'longitude'),
+        db.Index('idx_fish_predictions_user_created_id', 'user_id', db.desc('created_at'), db.desc('id')),
+        # Covers the active-prediction heatmap scan (species, expiry,
+        # probability and coordinates) so it needs no heap fetches
+        db.Index(
+            'idx_fish_predictions_species_expires', 'species', 'expires_at',
+            postgresql_include=['probability', 'latitude', 'longitude'],
+            postgresql_where=db.text('expires_at IS NOT NULL')
+        ),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -115,31 +188,35 @@ class FishPrediction(db.Model):
     longitude = db.Column(db.Float, nullable=False)
     probability = db.Column(db.Float, nullable=False)  # 0.0 to 1.0
     confidence_interval = db.Column(db.Float, nullable=True)
-    prediction_factors = db.Column(db.Text, nullable=True)  # JSON string
+    prediction_factors = db.Column(JSONDocument, nullable=True)
     model_version = db.Column(db.String(20), default='1.0')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     expires_at = db.Column(db.DateTime)  # When prediction expires
     
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'user_id': self.user_id,
-            'species': self.species,
-            'location': self.location,
-            'latitude': self.latitude,
-            'longitude': self.longitude,
-            'probability': self.probability,
-            'confidence_interval': self.confidence_interval,
-            'prediction_factors': self.prediction_factors,
-            'model_version': self.model_version,
-            'created_at': self.created_at.isoformat(),
-            'expires_at': self.expires_at.isoformat() if self.expires_at else None
-        }
+    _json_fields = (
+        'id', 'user_id', 'species', 'location', 'latitude', 'longitude',
+        'probability', 'confidence_interval', 'prediction_factors',
+        'model_version', 'created_at', 'expires_at'
+    )
+    _datetime_fields = ('created_at', 'expires_at')
 
-class VesselTrack(db.Model):
+class VesselTrack(BulkInsertMixin, SerializerMixin, db.Model):
     __tablename__ = 'vessel_tracks'
+    __table_args__ = (
+        db.Index('idx_vessel_tracks_mmsi_timestamp', 'mmsi', 'timestamp'),
+        db.Index('idx_vessel_tracks_timestamp_id', db.desc('timestamp'), db.desc('id')),
+        # Serves vessel type filters and the type distribution from the
+        # index alone, skipping the untyped rows
+        db.Index(
+            'idx_vessel_tracks_type_timestamp', 'vessel_type', db.desc('timestamp'), db.desc('id'),
+            postgresql_where=db.text('vessel_type IS NOT NULL')
+        ),
+        # Range-partitioned by day, as in schema.sql; the daily partitions
+        # are managed by the functions defined there and in migration 002
+        {'postgresql_partition_by': 'RANGE (timestamp)'},
+    )
     
-    id = db.Column(db.Integer, primary_key=True)
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     mmsi = db.Column(db.String(20), nullable=False)  # Maritime Mobile Service Identity
     vessel_name = db.Column(db.String(100), nullable=True)
     vessel_type = db.Column(db.String(50), nullable=True)
@@ -147,25 +224,27 @@ class VesselTrack(db.Model):
     longitude = db.Column(db.Float, nullable=False)
     speed = db.Column(db.Float, nullable=True)  # knots
     course = db.Column(db.Float, nullable=True)  # degrees
-    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+    # The partition key has to be part of the primary key
+    timestamp = db.Column(db.DateTime, primary_key=True, nullable=False, default=datetime.utcnow)
     data_source = db.Column(db.String(20), default='ais')  # ais, marinetraffic
     
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'mmsi': self.mmsi,
-            'vessel_name': self.vessel_name,
-            'vessel_type': self.vessel_type,
-            'latitude': self.latitude,
-            'longitude': self.longitude,
-            'speed': self.speed,
-            'course': self.course,
-            'timestamp': self.timestamp.isoformat(),
-            'data_source': self.data_source
-        }
+    _json_fields = (
+        'id', 'mmsi', 'vessel_name', 'vessel_type', 'latitude', 'longitude',
+        'speed', 'course', 'timestamp', 'data_source'
+    )
+    _datetime_fields = ('timestamp',)
 
-class Report(db.Model):
+# Rows outside every daily partition land here instead of failing to insert
+event.listen(
+    VesselTrack.__table__, 'after_create',
+    DDL("CREATE TABLE vessel_tracks_default PARTITION OF vessel_tracks DEFAULT").execute_if(dialect='postgresql')
+)
+
+class Report(SerializerMixin, db.Model):
     __tablename__ = 'reports'
+    __table_args__ = (
+        db.Index('idx_reports_user_generated_id', 'user_id', db.desc('generated_at'), db.desc('id')),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -173,15 +252,12 @@ class Report(db.Model):
     report_type = db.Column(db.String(50), nullable=False)  # pdf, markdown, analysis
     content = db.Column(db.Text, nullable=False)
     file_path = db.Column(db.String(500), nullable=True)
+    status = db.Column(db.String(20), nullable=False, default='done')  # pending, running, done, failed
+    file_status = db.Column(db.String(20), nullable=True)  # present, purged; null until a file is written
     generated_at = db.Column(db.DateTime, default=datetime.utcnow)
     
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'user_id': self.user_id,
-            'title': self.title,
-            'report_type': self.report_type,
-            'content': self.content,
-            'file_path': self.file_path,
-            'generated_at': self.generated_at.isoformat()
-        }
\ No newline at end of file
+    _json_fields = (
+        'id', 'user_id', 'title', 'report_type', 'content', 'file_path',
+        'status', 'file_status', 'generated_at'
+    )
+    _datetime_fields = ('generated_at',)
\ No newline at end of file
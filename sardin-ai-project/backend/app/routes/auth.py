@@ -2,6 +2,7 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
 from app import db
 from app.models import User
+from app.utils.user_cache import get_user_profile, invalidate_user_profile
 from werkzeug.security import generate_password_hash, check_password_hash
 import re
 
@@ -112,13 +113,13 @@ def login():
 def get_profile():
     try:
         user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        profile = get_user_profile(user_id)
         
-        if not user:
+        if not profile:
             return jsonify({'error': 'User not found'}), 404
         
         return jsonify({
-            'user': user.to_dict()
+            'user': profile
         }), 200
         
     except Exception as e:
@@ -169,6 +170,7 @@ def update_profile():
             user.password_hash = generate_password_hash(password)
         
         db.session.commit()
+        invalidate_user_profile(user_id)
         
         return jsonify({
             'message': 'Profile updated successfully',
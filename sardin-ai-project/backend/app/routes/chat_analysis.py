@@ -1,11 +1,12 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, url_for
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app import db, cache
+from app import db, cache, get_service, limiter
 from app.models import ChatSession, ChatAnalysis
 from app.services.ai_service import AIService
 from app.services.report_service import ReportService
-import json
-from datetime import datetime, timedelta
+from app.tasks import ANALYSIS_TIMEOUT, analyze_chat_task
+from app.utils.pagination import keyset_page
+from datetime import datetime
 
 chat_analysis_bp = Blueprint('chat_analysis', __name__)
 
@@ -22,15 +23,19 @@ def create_chat_session():
         session = ChatSession(
             user_id=user_id,
             title=data['title'],
-            chat_data=json.dumps(data['chat_data'])
+            chat_data=data['chat_data']
         )
         
+        # Serialize after the flush assigns the id but before the commit
+        # expires the instance, so it isn't reloaded
         db.session.add(session)
+        db.session.flush()
+        session_data = session.to_dict()
         db.session.commit()
         
         return jsonify({
             'message': 'Chat session created successfully',
-            'session': session.to_dict()
+            'session': session_data
         }), 201
         
     except Exception as e:
@@ -42,20 +47,21 @@ def create_chat_session():
 def get_chat_sessions():
     try:
         user_id = get_jwt_identity()
-        page = request.args.get('page', 1, type=int)
+        cursor = request.args.get('cursor')
         per_page = request.args.get('per_page', 10, type=int)
         
-        sessions = ChatSession.query.filter_by(user_id=user_id)\
-            .order_by(ChatSession.created_at.desc())\
-            .paginate(page=page, per_page=per_page, error_out=False)
+        sessions, next_cursor = keyset_page(
+            ChatSession.json_select().where(ChatSession.user_id == user_id),
+            ChatSession.created_at, ChatSession.id, cursor, per_page
+        )
         
         return jsonify({
-            'sessions': [session.to_dict() for session in sessions.items],
-            'total': sessions.total,
-            'pages': sessions.pages,
-            'current_page': page
+            'sessions': [ChatSession.row_to_dict(row) for row in sessions],
+            'next_cursor': next_cursor
         }), 200
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -77,61 +83,130 @@ def get_chat_session(session_id):
         return jsonify({'error': str(e)}), 500
 
 @chat_analysis_bp.route('/sessions/<int:session_id>/analyze', methods=['POST'])
+@limiter.limit("10 per minute")
 @jwt_required()
 def analyze_chat_session(session_id):
     try:
         user_id = get_jwt_identity()
-        session = ChatSession.query.filter_by(id=session_id, user_id=user_id).first()
+        sync = request.args.get('sync', 0, type=int)
         
-        if not session:
+        # Only an inline analysis needs the chat itself; otherwise loading the
+        # key is enough to check the session exists and belongs to the user
+        column = ChatSession.chat_data if sync else ChatSession.id
+        found = db.session.scalar(db.select(column).filter_by(id=session_id, user_id=user_id))
+        
+        if found is None:
             return jsonify({'error': 'Session not found'}), 404
         
         data = request.get_json()
         analysis_type = data.get('analysis_type', 'sentiment')
         
-        # Parse chat data
-        chat_data = json.loads(session.chat_data)
-        
-        # Initialize AI service
-        ai_service = AIService()
-        
-        # Perform analysis based on type
-        if analysis_type == 'sentiment':
-            result = ai_service.analyze_sentiment(chat_data)
-        elif analysis_type == 'topics':
-            result = ai_service.extract_topics(chat_data)
-        elif analysis_type == 'summary':
-            result = ai_service.generate_summary(chat_data)
-        else:
+        if analysis_type not in AIService.ANALYSIS_METHODS:
             return jsonify({'error': 'Invalid analysis type'}), 400
         
-        # Save analysis result
+        # ?sync=1 runs the analysis inline and returns its result
+        if sync:
+            result = get_service(AIService).run_analysis(analysis_type, found)
+            
+            analysis = ChatAnalysis(
+                chat_session_id=session_id,
+                analysis_type=analysis_type,
+                result_data=result,
+                confidence_score=result.get('confidence_score', 0.0)
+            )
+            
+            # Serialize after the flush assigns the id but before the commit
+            # expires the instance, so it isn't reloaded
+            db.session.add(analysis)
+            db.session.flush()
+            analysis_data = analysis.to_dict()
+            db.session.commit()
+            
+            # The result is returned once, under 'result'
+            del analysis_data['result_data']
+            
+            return jsonify({
+                'message': 'Analysis completed successfully',
+                'analysis': analysis_data,
+                'result': result
+            }), 200
+        
+        # Repeated requests while the same analysis is still queued or running
+        # join it instead of starting another AI call; sessions don't change
+        # after creation, so the result would be the same. Analyses older than
+        # ANALYSIS_TIMEOUT are presumed lost and not joined
+        in_flight = db.session.scalar(
+            db.select(ChatAnalysis.id).filter(
+                ChatAnalysis.chat_session_id == session_id,
+                ChatAnalysis.analysis_type == analysis_type,
+                ChatAnalysis.status.in_(('pending', 'running')),
+                ChatAnalysis.created_at > datetime.utcnow() - ANALYSIS_TIMEOUT
+            ).limit(1)
+        )
+        if in_flight is not None:
+            return jsonify({
+                'message': 'Analysis already in progress',
+                'analysis_id': in_flight,
+                'status_url': url_for('chat_analysis.get_analysis', analysis_id=in_flight)
+            }), 202
+        
+        # Otherwise record a pending analysis and hand it to a worker, so the
+        # request doesn't hold a web worker for the model latency
         analysis = ChatAnalysis(
             chat_session_id=session_id,
             analysis_type=analysis_type,
-            result_data=json.dumps(result),
-            confidence_score=result.get('confidence_score', 0.0)
+            result_data={},
+            status='pending'
         )
         
+        # Read the id before the commit expires the instance
         db.session.add(analysis)
+        db.session.flush()
+        analysis_id = analysis.id
         db.session.commit()
         
+        analyze_chat_task.delay(analysis_id)
+        
         return jsonify({
-            'message': 'Analysis completed successfully',
-            'analysis': analysis.to_dict(),
-            'result': result
-        }), 200
+            'message': 'Analysis queued',
+            'analysis_id': analysis_id,
+            'status_url': url_for('chat_analysis.get_analysis', analysis_id=analysis_id)
+        }), 202
         
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+@chat_analysis_bp.route('/analyses/<int:analysis_id>', methods=['GET'])
+@jwt_required()
+def get_analysis(analysis_id):
+    try:
+        user_id = get_jwt_identity()
+        analysis = ChatAnalysis.query.join(ChatSession).filter(
+            ChatAnalysis.id == analysis_id,
+            ChatSession.user_id == user_id
+        ).first()
+        
+        if not analysis:
+            return jsonify({'error': 'Analysis not found'}), 404
+        
+        return jsonify({
+            'analysis': analysis.to_dict()
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @chat_analysis_bp.route('/sessions/<int:session_id>/report', methods=['POST'])
 @jwt_required()
 def generate_chat_report(session_id):
     try:
         user_id = get_jwt_identity()
-        session = ChatSession.query.filter_by(id=session_id, user_id=user_id).first()
+        
+        # Only the columns the report uses
+        session = db.session.execute(
+            db.select(ChatSession.title, ChatSession.chat_data).filter_by(id=session_id, user_id=user_id)
+        ).first()
         
         if not session:
             return jsonify({'error': 'Session not found'}), 404
@@ -139,28 +214,26 @@ def generate_chat_report(session_id):
         data = request.get_json()
         report_format = data.get('format', 'markdown')
         
-        # Get all analyses for this session
-        analyses = ChatAnalysis.query.filter_by(chat_session_id=session_id).all()
+        if report_format not in ('markdown', 'pdf'):
+            return jsonify({'error': 'Invalid report format'}), 400
         
-        # Parse chat data and analyses
-        chat_data = json.loads(session.chat_data)
-        analysis_results = [json.loads(analysis.result_data) for analysis in analyses]
+        # Get all completed analysis results for this session; only the JSON
+        # column is loaded, already decoded by the driver, without building
+        # ORM objects
+        analysis_results = db.session.scalars(
+            db.select(ChatAnalysis.result_data).filter_by(chat_session_id=session_id, status='done')
+        ).all()
         
         # Generate report
-        report_service = ReportService()
+        report_service = get_service(ReportService)
+        report_content = report_service.generate_markdown_report(
+            session.title, session.chat_data, analysis_results
+        )
         
         if report_format == 'markdown':
-            report_content = report_service.generate_markdown_report(
-                session.title, chat_data, analysis_results
-            )
             file_path = report_service.save_markdown_report(report_content, f"chat_report_{session_id}")
-        elif report_format == 'pdf':
-            markdown_content = report_service.generate_markdown_report(
-                session.title, chat_data, analysis_results
-            )
-            file_path = report_service.generate_pdf_report(markdown_content, f"chat_report_{session_id}")
         else:
-            return jsonify({'error': 'Invalid report format'}), 400
+            file_path = report_service.generate_pdf_report(report_content, f"chat_report_{session_id}")
         
         return jsonify({
             'message': 'Report generated successfully',
@@ -177,16 +250,15 @@ def generate_chat_report(session_id):
 def delete_chat_session(session_id):
     try:
         user_id = get_jwt_identity()
-        session = ChatSession.query.filter_by(id=session_id, user_id=user_id).first()
         
-        if not session:
-            return jsonify({'error': 'Session not found'}), 404
+        # Delete the session in one statement without loading it; its
+        # analyses go with it through the ON DELETE CASCADE foreign key
+        deleted = ChatSession.query.filter_by(id=session_id, user_id=user_id)\
+            .delete(synchronize_session=False)
         
-        # Delete associated analyses
-        ChatAnalysis.query.filter_by(chat_session_id=session_id).delete()
+        if not deleted:
+            return jsonify({'error': 'Session not found'}), 404
         
-        # Delete session
-        db.session.delete(session)
         db.session.commit()
         
         return jsonify({
@@ -195,25 +267,4 @@ def delete_chat_session(session_id):
         
     except Exception as e:
         db.session.rollback()
-        return jsonify({'error': str(e)}), 500
-
-@chat_analysis_bp.route('/analyses/<int:analysis_id>', methods=['GET'])
-@jwt_required()
-def get_analysis(analysis_id):
-    try:
-        user_id = get_jwt_identity()
-        analysis = ChatAnalysis.query.join(ChatSession).filter(
-            ChatAnalysis.id == analysis_id,
-            ChatSession.user_id == user_id
-        ).first()
-        
-        if not analysis:
-            return jsonify({'error': 'Analysis not found'}), 404
-        
-        return jsonify({
-            'analysis': analysis.to_dict(),
-            'result': json.loads(analysis.result_data)
-        }), 200
-        
-    except Exception as e:
         return jsonify({'error': str(e)}), 500
\ No newline at end of file
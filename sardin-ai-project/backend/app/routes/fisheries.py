@@ -1,32 +1,38 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app import db, cache
+from app import db, get_service, limiter
 from app.models import FishPrediction, VesselTrack
 from app.services.prediction_service import PredictionService
 from app.services.marinetraffic_service import MarineTrafficService
-import json
+from app.utils.pagination import keyset_page
+from app.utils.swr_cache import stale_while_revalidate
+from app.utils.validation import ValidationError, json_body
+from sqlalchemy import case, func, literal, select, union_all
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 
 fisheries_bp = Blueprint('fisheries', __name__)
 
+# Most MarineTraffic area requests in flight at once per fetch
+MARINETRAFFIC_CONCURRENCY = 8
+
+# Heatmap points are aggregated into square bins of this size, in degrees
+HEATMAP_BIN_DEGREES = 0.1
+
 @fisheries_bp.route('/predict', methods=['POST'])
+@limiter.limit("30 per minute")
 @jwt_required()
 def predict_fish_location():
     try:
         user_id = get_jwt_identity()
-        data = request.get_json()
-        
-        required_fields = ['species', 'latitude', 'longitude']
-        for field in required_fields:
-            if field not in data:
-                return jsonify({'error': f'Missing required field: {field}'}), 400
+        data = json_body(['species', 'latitude', 'longitude'])
         
         species = data['species']
         latitude = data['latitude']
         longitude = data['longitude']
         
-        # Initialize prediction service
-        prediction_service = PredictionService()
+        # Shared prediction service (built once per process)
+        prediction_service = PredictionService.shared()
         
         # Get prediction
         prediction_result = prediction_service.predict_fish_location(
@@ -42,19 +48,25 @@ def predict_fish_location():
             longitude=longitude,
             probability=prediction_result['probability'],
             confidence_interval=prediction_result.get('confidence_interval'),
-            prediction_factors=json.dumps(prediction_result.get('factors', {})),
+            prediction_factors=prediction_result.get('factors', {}),
             expires_at=datetime.utcnow() + timedelta(hours=24)  # Prediction expires in 24 hours
         )
         
+        # Serialize after the flush assigns the id but before the commit
+        # expires the instance, so it isn't reloaded
         db.session.add(prediction)
+        db.session.flush()
+        prediction_data = prediction.to_dict()
         db.session.commit()
         
         return jsonify({
             'message': 'Fish prediction generated successfully',
-            'prediction': prediction.to_dict(),
+            'prediction': prediction_data,
             'details': prediction_result
         }), 201
         
+    except ValidationError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -64,31 +76,32 @@ def predict_fish_location():
 def get_predictions():
     try:
         user_id = get_jwt_identity()
-        page = request.args.get('page', 1, type=int)
+        cursor = request.args.get('cursor')
         per_page = request.args.get('per_page', 20, type=int)
         species = request.args.get('species')
         
-        query = FishPrediction.query.filter_by(user_id=user_id)
+        query = FishPrediction.json_select().where(FishPrediction.user_id == user_id)
         
         if species:
-            query = query.filter_by(species=species)
+            query = query.where(FishPrediction.species == species)
         
         # Only show active predictions (not expired)
-        query = query.filter(
+        query = query.where(
             (FishPrediction.expires_at.is_(None)) |
             (FishPrediction.expires_at > datetime.utcnow())
         )
         
-        predictions = query.order_by(FishPrediction.created_at.desc())\
-            .paginate(page=page, per_page=per_page, error_out=False)
+        predictions, next_cursor = keyset_page(
+            query, FishPrediction.created_at, FishPrediction.id, cursor, per_page
+        )
         
         return jsonify({
-            'predictions': [pred.to_dict() for pred in predictions.items],
-            'total': predictions.total,
-            'pages': predictions.pages,
-            'current_page': page
+            'predictions': [FishPrediction.row_to_dict(row) for row in predictions],
+            'next_cursor': next_cursor
         }), 200
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -97,18 +110,30 @@ def get_predictions():
 def get_prediction(prediction_id):
     try:
         user_id = get_jwt_identity()
-        prediction = FishPrediction.query.filter_by(id=prediction_id, user_id=user_id).first()
         
-        if not prediction:
+        # Evaluate expiry in the same query, and only fetch the factors
+        # document for predictions that haven't expired
+        expired = FishPrediction.expires_at < datetime.utcnow()
+        factors = case((expired, None), else_=FishPrediction.prediction_factors)
+        columns = [
+            factors.label(field) if field == 'prediction_factors' else getattr(FishPrediction, field)
+            for field in FishPrediction._json_fields
+        ]
+        row = db.session.execute(
+            select(*columns, expired.label('expired'))
+            .where(FishPrediction.id == prediction_id, FishPrediction.user_id == user_id)
+        ).first()
+        
+        if not row:
             return jsonify({'error': 'Prediction not found'}), 404
         
-        # Check if prediction is expired
-        if prediction.expires_at and prediction.expires_at < datetime.utcnow():
+        # Check if prediction is expired (never, without an expiry time)
+        if row.expired:
             return jsonify({'error': 'Prediction has expired'}), 410
         
         return jsonify({
-            'prediction': prediction.to_dict(),
-            'factors': json.loads(prediction.prediction_factors) if prediction.prediction_factors else {}
+            'prediction': FishPrediction.row_to_dict(row[:-1]),
+            'factors': row.prediction_factors or {}
         }), 200
         
     except Exception as e:
@@ -119,12 +144,7 @@ def get_prediction(prediction_id):
 def add_vessel_track():
     try:
         user_id = get_jwt_identity()
-        data = request.get_json()
-        
-        required_fields = ['mmsi', 'latitude', 'longitude']
-        for field in required_fields:
-            if field not in data:
-                return jsonify({'error': f'Missing required field: {field}'}), 400
+        data = json_body(['mmsi', 'latitude', 'longitude'])
         
         vessel_track = VesselTrack(
             mmsi=data['mmsi'],
@@ -137,14 +157,20 @@ def add_vessel_track():
             data_source=data.get('data_source', 'user_input')
         )
         
+        # Serialize after the flush assigns the id but before the commit
+        # expires the instance, so it isn't reloaded
         db.session.add(vessel_track)
+        db.session.flush()
+        vessel_track_data = vessel_track.to_dict()
         db.session.commit()
         
         return jsonify({
             'message': 'Vessel track added successfully',
-            'vessel': vessel_track.to_dict()
+            'vessel': vessel_track_data
         }), 201
         
+    except ValidationError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -153,30 +179,31 @@ def add_vessel_track():
 @jwt_required()
 def get_vessel_tracks():
     try:
-        page = request.args.get('page', 1, type=int)
+        cursor = request.args.get('cursor')
         per_page = request.args.get('per_page', 50, type=int)
         vessel_type = request.args.get('vessel_type')
         
-        query = VesselTrack.query
+        query = VesselTrack.json_select()
         
         if vessel_type:
-            query = query.filter_by(vessel_type=vessel_type)
+            query = query.where(VesselTrack.vessel_type == vessel_type)
         
         # Get recent tracks (last 24 hours)
-        query = query.filter(
+        query = query.where(
             VesselTrack.timestamp >= datetime.utcnow() - timedelta(hours=24)
         )
         
-        vessel_tracks = query.order_by(VesselTrack.timestamp.desc())\
-            .paginate(page=page, per_page=per_page, error_out=False)
+        vessel_tracks, next_cursor = keyset_page(
+            query, VesselTrack.timestamp, VesselTrack.id, cursor, per_page
+        )
         
         return jsonify({
-            'vessels': [vessel.to_dict() for vessel in vessel_tracks.items],
-            'total': vessel_tracks.total,
-            'pages': vessel_tracks.pages,
-            'current_page': page
+            'vessels': [VesselTrack.row_to_dict(row) for row in vessel_tracks],
+            'next_cursor': next_cursor
         }), 200
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -187,88 +214,101 @@ def fetch_marinetraffic_data():
         user_id = get_jwt_identity()
         data = request.get_json()
         
-        if not data.get('area'):
+        # One area, or several to fetch at once;
+        # e.g., "32.5,-117.5,31.5,-116.5" (lat1,lon1,lat2,lon2)
+        areas = data.get('areas') or ([data['area']] if data.get('area') else [])
+        if not areas:
             return jsonify({'error': 'Area is required'}), 400
         
-        area = data['area']  # e.g., "32.5,-117.5,31.5,-116.5" (lat1,lon1,lat2,lon2)
-        
-        # Initialize MarineTraffic service
-        traffic_service = MarineTrafficService()
-        
-        # Fetch vessel data from MarineTraffic
-        vessels_data = traffic_service.get_vessels_in_area(area)
-        
-        # Save vessel tracks to database
-        saved_vessels = []
-        for vessel_data in vessels_data:
-            vessel_track = VesselTrack(
-                mmsi=vessel_data.get('mmsi'),
-                vessel_name=vessel_data.get('vessel_name'),
-                vessel_type=vessel_data.get('vessel_type'),
-                latitude=vessel_data.get('latitude'),
-                longitude=vessel_data.get('longitude'),
-                speed=vessel_data.get('speed'),
-                course=vessel_data.get('course'),
-                data_source='marinetraffic'
-            )
-            
-            db.session.add(vessel_track)
-            saved_vessels.append(vessel_track)
+        # Shared MarineTraffic service
+        traffic_service = get_service(MarineTrafficService)
+        
+        vessels = []
+        raw_data = []
+        
+        # Fetch all areas concurrently, saving each area's vessel tracks in
+        # bulk as soon as it arrives while the remaining requests are in flight
+        with ThreadPoolExecutor(max_workers=min(len(areas), MARINETRAFFIC_CONCURRENCY)) as executor:
+            futures = [executor.submit(traffic_service.get_vessels_in_area, area) for area in areas]
+            for future in as_completed(futures):
+                vessels_data = future.result()
+                raw_data.extend(vessels_data)
+                
+                vessel_rows = [
+                    {
+                        'mmsi': vessel_data.get('mmsi'),
+                        'vessel_name': vessel_data.get('vessel_name'),
+                        'vessel_type': vessel_data.get('vessel_type'),
+                        'latitude': vessel_data.get('latitude'),
+                        'longitude': vessel_data.get('longitude'),
+                        'speed': vessel_data.get('speed'),
+                        'course': vessel_data.get('course'),
+                        'data_source': 'marinetraffic'
+                    }
+                    for vessel_data in vessels_data
+                ]
+                
+                # Serialize before committing; the commit expires the instances,
+                # and reading them afterwards would reload every row with its own SELECT
+                vessels.extend(vessel.to_dict() for vessel in VesselTrack.bulk_insert(vessel_rows))
         
         db.session.commit()
         
         return jsonify({
-            'message': f'MarineTraffic data fetched successfully. Saved {len(saved_vessels)} vessel tracks.',
-            'vessels': [vessel.to_dict() for vessel in saved_vessels],
-            'raw_data': vessels_data
+            'message': f'MarineTraffic data fetched successfully. Saved {len(vessels)} vessel tracks.',
+            'vessels': vessels,
+            'raw_data': raw_data
         }), 200
         
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
-@fisheries_bp.route('/heatmap/sardine', methods=['GET'])
-@cache.cached(timeout=600)  # Cache for 10 minutes
-def get_sardine_heatmap():
-    try:
-        # Get recent sardine predictions for heatmap
-        recent_predictions = FishPrediction.query.filter(
+@stale_while_revalidate('fisheries:heatmap:sardine', ttl=600, stale_ttl=300)  # Fresh for 10 minutes
+def _sardine_heatmap():
+    # Bin active sardine predictions in the database, so the payload has one
+    # point per occupied bin rather than one per prediction
+    lat_bin = (func.round(FishPrediction.latitude / HEATMAP_BIN_DEGREES) * HEATMAP_BIN_DEGREES).label('lat')
+    lng_bin = (func.round(FishPrediction.longitude / HEATMAP_BIN_DEGREES) * HEATMAP_BIN_DEGREES).label('lng')
+    bins = db.session.execute(
+        select(lat_bin, lng_bin, func.avg(FishPrediction.probability), func.count())
+        .where(
             FishPrediction.species == 'sardina',
             FishPrediction.probability > 0.5,
             FishPrediction.expires_at > datetime.utcnow()
-        ).all()
-        
-        heatmap_data = []
-        for prediction in recent_predictions:
-            heatmap_data.append({
-                'lat': prediction.latitude,
-                'lng': prediction.longitude,
-                'weight': prediction.probability,
-                'location': prediction.location
-            })
-        
-        return jsonify({
-            'heatmap_data': heatmap_data,
-            'total_points': len(heatmap_data)
-        }), 200
+        )
+        .group_by(lat_bin, lng_bin)
+    ).all()
+    
+    heatmap_data = [
+        {'lat': lat, 'lng': lng, 'weight': weight, 'count': count}
+        for lat, lng, weight, count in bins
+    ]
+    
+    return {
+        'heatmap_data': heatmap_data,
+        'total_points': len(heatmap_data),
+        'total_predictions': sum(point['count'] for point in heatmap_data)
+    }
+
+@fisheries_bp.route('/heatmap/sardine', methods=['GET'])
+def get_sardine_heatmap():
+    try:
+        return jsonify(_sardine_heatmap()), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @fisheries_bp.route('/routes/optimize', methods=['POST'])
+@limiter.limit("30 per minute")
 @jwt_required()
 def optimize_fishing_route():
     try:
         user_id = get_jwt_identity()
-        data = request.get_json()
-        
-        required_fields = ['start_lat', 'start_lon', 'end_lat', 'end_lon', 'species']
-        for field in required_fields:
-            if field not in data:
-                return jsonify({'error': f'Missing required field: {field}'}), 400
+        data = json_body(['start_lat', 'start_lon', 'end_lat', 'end_lon', 'species'])
         
-        # Initialize prediction service
-        prediction_service = PredictionService()
+        # Shared prediction service (built once per process)
+        prediction_service = PredictionService.shared()
         
         # Optimize route
         route_result = prediction_service.optimize_fishing_route(
@@ -285,48 +325,63 @@ def optimize_fishing_route():
             'route': route_result
         }), 200
         
+    except ValidationError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@stale_while_revalidate('fisheries:stats', ttl=3600, stale_ttl=600)  # Fresh for 1 hour
+def _fisheries_stats():
+    now = datetime.utcnow()
+    
+    # All four counts in one round trip, as scalar subqueries of one SELECT
+    counts = db.session.execute(select(
+        select(func.count()).select_from(FishPrediction)
+            .scalar_subquery().label('total_predictions'),
+        select(func.count()).select_from(FishPrediction)
+            .where(FishPrediction.expires_at > now)
+            .scalar_subquery().label('active_predictions'),
+        select(func.count()).select_from(VesselTrack)
+            .scalar_subquery().label('total_tracks'),
+        select(func.count()).select_from(VesselTrack)
+            .where(VesselTrack.timestamp >= now - timedelta(hours=24))
+            .scalar_subquery().label('recent_activity')
+    )).one()
+    
+    stats = {
+        'total_predictions': counts.total_predictions,
+        'active_predictions': counts.active_predictions,
+        'species_distribution': {},
+        'vessel_tracking': {
+            'total_tracks': counts.total_tracks,
+            'recent_activity': counts.recent_activity,
+            'type_distribution': {}
+        }
+    }
+    
+    # Species and vessel type distributions in a second round trip,
+    # told apart by a discriminator column
+    distributions = db.session.execute(union_all(
+        select(literal('species'), FishPrediction.species, func.count())
+            .group_by(FishPrediction.species),
+        select(literal('vessel_type'), VesselTrack.vessel_type, func.count())
+            .where(VesselTrack.vessel_type.isnot(None))
+            .group_by(VesselTrack.vessel_type)
+    )).all()
+    
+    targets = {
+        'species': stats['species_distribution'],
+        'vessel_type': stats['vessel_tracking']['type_distribution']
+    }
+    for kind, key, count in distributions:
+        targets[kind][key] = count
+    
+    return stats
+
 @fisheries_bp.route('/stats', methods=['GET'])
-@cache.cached(timeout=3600)  # Cache for 1 hour
 def get_fisheries_stats():
     try:
-        stats = {
-            'total_predictions': FishPrediction.query.count(),
-            'active_predictions': FishPrediction.query.filter(
-                FishPrediction.expires_at > datetime.utcnow()
-            ).count(),
-            'species_distribution': {},
-            'vessel_tracking': {
-                'total_tracks': VesselTrack.query.count(),
-                'recent_activity': VesselTrack.query.filter(
-                    VesselTrack.timestamp >= datetime.utcnow() - timedelta(hours=24)
-                ).count()
-            }
-        }
-        
-        # Species distribution
-        from sqlalchemy import func
-        species_dist = db.session.query(
-            FishPrediction.species,
-            func.count(FishPrediction.id).label('count')
-        ).group_by(FishPrediction.species).all()
-        
-        for species, count in species_dist:
-            stats['species_distribution'][species] = count
-        
-        # Vessel types distribution
-        vessel_types = db.session.query(
-            VesselTrack.vessel_type,
-            func.count(VesselTrack.id).label('count')
-        ).filter(VesselTrack.vessel_type.isnot(None)).group_by(VesselTrack.vessel_type).all()
-        
-        stats['vessel_tracking']['type_distribution'] = {
-            vessel_type: count for vessel_type, count in vessel_types
-        }
-        
-        return jsonify(stats), 200
+        return jsonify(_fisheries_stats()), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
\ No newline at end of file
@@ -1,10 +1,13 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app import db, cache
+from sqlalchemy import func, select
+from app import db, cache, get_service
 from app.models import OceanData
 from app.services.noaa_service import NOAAService
-from app.services.cicese_service = CICESEService
-import json
+from app.services.cicese_service import CICESEService
+from app.utils.pagination import keyset_page
+from app.utils.validation import ValidationError, json_body
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
 oceanographic_bp = Blueprint('oceanographic', __name__)
@@ -14,12 +17,7 @@ oceanographic_bp = Blueprint('oceanographic', __name__)
 def add_ocean_data():
     try:
         user_id = get_jwt_identity()
-        data = request.get_json()
-        
-        required_fields = ['location', 'latitude', 'longitude']
-        for field in required_fields:
-            if field not in data:
-                return jsonify({'error': f'Missing required field: {field}'}), 400
+        data = json_body(['location', 'latitude', 'longitude'])
         
         ocean_data = OceanData(
             user_id=user_id,
@@ -35,14 +33,20 @@ def add_ocean_data():
             data_source=data.get('data_source', 'user_input')
         )
         
+        # Serialize after the flush assigns the id but before the commit
+        # expires the instance, so it isn't reloaded
         db.session.add(ocean_data)
+        db.session.flush()
+        ocean_data_data = ocean_data.to_dict()
         db.session.commit()
         
         return jsonify({
             'message': 'Ocean data added successfully',
-            'data': ocean_data.to_dict()
+            'data': ocean_data_data
         }), 201
         
+    except ValidationError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -52,7 +56,7 @@ def add_ocean_data():
 def get_ocean_data():
     try:
         user_id = get_jwt_identity()
-        page = request.args.get('page', 1, type=int)
+        cursor = request.args.get('cursor')
         per_page = request.args.get('per_page', 50, type=int)
         
         # Filter parameters
@@ -61,53 +65,68 @@ def get_ocean_data():
         start_date = request.args.get('start_date')
         end_date = request.args.get('end_date')
         
-        query = OceanData.query
+        query = OceanData.json_select()
         
         if user_id != 1:  # Assuming user_id 1 is admin/system user
-            query = query.filter_by(user_id=user_id)
+            query = query.where(OceanData.user_id == user_id)
         
         if location:
-            query = query.filter(OceanData.location.contains(location))
+            query = query.where(OceanData.location.contains(location))
         
         if data_source:
-            query = query.filter_by(data_source=data_source)
+            query = query.where(OceanData.data_source == data_source)
         
         if start_date:
             start_datetime = datetime.fromisoformat(start_date)
-            query = query.filter(OceanData.timestamp >= start_datetime)
+            query = query.where(OceanData.timestamp >= start_datetime)
         
         if end_date:
             end_datetime = datetime.fromisoformat(end_date)
-            query = query.filter(OceanData.timestamp <= end_datetime)
+            query = query.where(OceanData.timestamp <= end_datetime)
         
-        ocean_data = query.order_by(OceanData.timestamp.desc())\
-            .paginate(page=page, per_page=per_page, error_out=False)
+        ocean_data, next_cursor = keyset_page(
+            query, OceanData.timestamp, OceanData.id, cursor, per_page
+        )
         
         return jsonify({
-            'data': [data.to_dict() for data in ocean_data.items],
-            'total': ocean_data.total,
-            'pages': ocean_data.pages,
-            'current_page': page
+            'data': [OceanData.row_to_dict(row) for row in ocean_data],
+            'next_cursor': next_cursor
         }), 200
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# Fields a data point's owner may change
+UPDATABLE_FIELDS = (
+    'temperature', 'chlorophyll', 'salinity',
+    'current_speed', 'current_direction', 'depth'
+)
+
+def _accessible(data_id, user_id):
+    """WHERE conditions matching data_id if the user may access it"""
+    conditions = [OceanData.id == data_id]
+    if user_id != 1:  # Assuming user_id 1 is admin/system user
+        conditions.append(OceanData.user_id == user_id)
+    return conditions
+
 @oceanographic_bp.route('/data/<int:data_id>', methods=['GET'])
 @jwt_required()
 def get_ocean_data_point(data_id):
     try:
         user_id = get_jwt_identity()
-        data_point = OceanData.query.filter_by(id=data_id).first()
+        
+        # Ownership is part of the query, so another user's point is never loaded
+        data_point = db.session.execute(
+            OceanData.json_select().where(*_accessible(data_id, user_id))
+        ).first()
         
         if not data_point:
             return jsonify({'error': 'Data point not found'}), 404
         
-        if user_id != 1 and data_point.user_id != user_id:
-            return jsonify({'error': 'Access denied'}), 403
-        
         return jsonify({
-            'data': data_point.to_dict()
+            'data': OceanData.row_to_dict(data_point)
         }), 200
         
     except Exception as e:
@@ -118,34 +137,34 @@ def get_ocean_data_point(data_id):
 def update_ocean_data(data_id):
     try:
         user_id = get_jwt_identity()
-        data_point = OceanData.query.filter_by(id=data_id).first()
+        data = json_body()
         
-        if not data_point:
-            return jsonify({'error': 'Data point not found'}), 404
+        values = {field: data[field] for field in UPDATABLE_FIELDS if field in data}
         
-        if user_id != 1 and data_point.user_id != user_id:
-            return jsonify({'error': 'Access denied'}), 403
-        
-        data = request.get_json()
+        # Update and read back the row in one statement; with nothing to
+        # change, just read it
+        if values:
+            statement = db.update(OceanData)\
+                .where(*_accessible(data_id, user_id))\
+                .values(**values)\
+                .returning(*OceanData.json_columns())
+        else:
+            statement = OceanData.json_select().where(*_accessible(data_id, user_id))
+        data_point = db.session.execute(statement).first()
         
-        updatable_fields = [
-            'temperature', 'chlorophyll', 'salinity', 
-            'current_speed', 'current_direction', 'depth'
-        ]
-        
-        for field in updatable_fields:
-            if field in data:
-                setattr(data_point, field, data[field])
-        
-        data_point.updated_at = datetime.utcnow()
+        if not data_point:
+            db.session.rollback()
+            return jsonify({'error': 'Data point not found'}), 404
         
         db.session.commit()
         
         return jsonify({
             'message': 'Ocean data updated successfully',
-            'data': data_point.to_dict()
+            'data': OceanData.row_to_dict(data_point)
         }), 200
         
+    except ValidationError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -155,15 +174,16 @@ def update_ocean_data(data_id):
 def delete_ocean_data(data_id):
     try:
         user_id = get_jwt_identity()
-        data_point = OceanData.query.filter_by(id=data_id).first()
         
-        if not data_point:
-            return jsonify({'error': 'Data point not found'}), 404
+        # Delete in one statement without loading the row
+        deleted = db.session.execute(
+            db.delete(OceanData).where(*_accessible(data_id, user_id))
+        ).rowcount
         
-        if user_id != 1 and data_point.user_id != user_id:
-            return jsonify({'error': 'Access denied'}), 403
+        if not deleted:
+            db.session.rollback()
+            return jsonify({'error': 'Data point not found'}), 404
         
-        db.session.delete(data_point)
         db.session.commit()
         
         return jsonify({
@@ -174,9 +194,96 @@ def delete_ocean_data(data_id):
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+# Upstream ocean data sources: service class and display name
+OCEAN_SOURCES = {
+    'noaa': (NOAAService, 'NOAA'),
+    'cicese': (CICESEService, 'CICESE')
+}
+
+# Shared pool for upstream fetches, so combined and batch fetches run concurrently
+FETCH_EXECUTOR = ThreadPoolExecutor(max_workers=16)
+
+# Most locations accepted by one batch fetch request
+MAX_FETCH_BATCH_SIZE = 500
+
+def _fetch_and_persist(fetches, user_id):
+    """
+    Fetch ocean data for each (source, latitude, longitude) and save it all in one commit
+    
+    Returns a list of (source, saved row as dict, raw upstream data) in input order.
+    """
+    def fetch(item):
+        source, latitude, longitude = item
+        return get_service(OCEAN_SOURCES[source][0]).get_ocean_data(latitude, longitude)
+    
+    if len(fetches) == 1:
+        raw_results = [fetch(fetches[0])]
+    else:
+        raw_results = list(FETCH_EXECUTOR.map(fetch, fetches))
+    
+    rows = [
+        {
+            'user_id': user_id,
+            'location': f"{OCEAN_SOURCES[source][1]} Data ({latitude}, {longitude})",
+            'latitude': latitude,
+            'longitude': longitude,
+            'temperature': raw.get('temperature'),
+            'chlorophyll': raw.get('chlorophyll'),
+            'salinity': raw.get('salinity'),
+            'current_speed': raw.get('current_speed'),
+            'current_direction': raw.get('current_direction'),
+            'data_source': source
+        }
+        for (source, latitude, longitude), raw in zip(fetches, raw_results)
+    ]
+    
+    # Serialize before committing; the commit expires the inserted instances
+    saved = [row.to_dict() for row in OceanData.bulk_insert(rows)]
+    db.session.commit()
+    
+    return [
+        (source, row, raw)
+        for (source, _, _), row, raw in zip(fetches, saved, raw_results)
+    ]
+
+def _fetch_source(source):
+    user_id = get_jwt_identity()
+    data = request.get_json()
+    
+    if not data.get('latitude') or not data.get('longitude'):
+        return jsonify({'error': 'Latitude and longitude are required'}), 400
+    
+    [(_, saved, raw)] = _fetch_and_persist([(source, data['latitude'], data['longitude'])], user_id)
+    
+    return jsonify({
+        'message': f'{OCEAN_SOURCES[source][1]} data fetched and saved successfully',
+        'data': saved,
+        'raw_data': raw
+    }), 200
+
 @oceanographic_bp.route('/fetch/noaa', methods=['POST'])
 @jwt_required()
 def fetch_noaa_data():
+    try:
+        return _fetch_source('noaa')
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@oceanographic_bp.route('/fetch/cicese', methods=['POST'])
+@jwt_required()
+def fetch_cicese_data():
+    try:
+        return _fetch_source('cicese')
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@oceanographic_bp.route('/fetch/all', methods=['POST'])
+@jwt_required()
+def fetch_all_data():
     try:
         user_id = get_jwt_identity()
         data = request.get_json()
@@ -184,106 +291,132 @@ def fetch_noaa_data():
         if not data.get('latitude') or not data.get('longitude'):
             return jsonify({'error': 'Latitude and longitude are required'}), 400
         
-        latitude = data['latitude']
-        longitude = data['longitude']
-        
-        # Initialize NOAA service
-        noaa_service = NOAAService()
-        
-        # Fetch data from NOAA
-        noaa_data = noaa_service.get_ocean_data(latitude, longitude)
-        
-        # Save to database
-        ocean_data = OceanData(
-            user_id=user_id,
-            location=f"NOAA Data ({latitude}, {longitude})",
-            latitude=latitude,
-            longitude=longitude,
-            temperature=noaa_data.get('temperature'),
-            chlorophyll=noaa_data.get('chlorophyll'),
-            salinity=noaa_data.get('salinity'),
-            current_speed=noaa_data.get('current_speed'),
-            current_direction=noaa_data.get('current_direction'),
-            data_source='noaa'
+        # Query every source concurrently
+        results = _fetch_and_persist(
+            [(source, data['latitude'], data['longitude']) for source in OCEAN_SOURCES], user_id
         )
         
-        db.session.add(ocean_data)
-        db.session.commit()
-        
         return jsonify({
-            'message': 'NOAA data fetched and saved successfully',
-            'data': ocean_data.to_dict(),
-            'raw_data': noaa_data
+            'message': 'Ocean data fetched and saved successfully from all sources',
+            'data': {source: saved for source, saved, _ in results},
+            'raw_data': {source: raw for source, _, raw in results}
         }), 200
         
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
-@oceanographic_bp.route('/fetch/cicese', methods=['POST'])
+@oceanographic_bp.route('/fetch/<source>/batch', methods=['POST'])
 @jwt_required()
-def fetch_cicese_data():
+def fetch_batch_data(source):
     try:
         user_id = get_jwt_identity()
         data = request.get_json()
         
-        if not data.get('latitude') or not data.get('longitude'):
-            return jsonify({'error': 'Latitude and longitude are required'}), 400
+        if source not in OCEAN_SOURCES:
+            return jsonify({'error': f'Unknown data source: {source}'}), 404
         
-        latitude = data['latitude']
-        longitude = data['longitude']
+        locations = data.get('locations') or []
+        if not locations:
+            return jsonify({'error': 'Locations are required'}), 400
         
-        # Initialize CICESE service
-        cicese_service = CICESEService()
+        if len(locations) > MAX_FETCH_BATCH_SIZE:
+            return jsonify({'error': f'At most {MAX_FETCH_BATCH_SIZE} locations per request'}), 400
         
-        # Fetch data from CICESE
-        cicese_data = cicese_service.get_ocean_data(latitude, longitude)
+        if any(not loc.get('latitude') or not loc.get('longitude') for loc in locations):
+            return jsonify({'error': 'Latitude and longitude are required for every location'}), 400
         
-        # Save to database
-        ocean_data = OceanData(
-            user_id=user_id,
-            location=f"CICESE Data ({latitude}, {longitude})",
-            latitude=latitude,
-            longitude=longitude,
-            temperature=cicese_data.get('temperature'),
-            chlorophyll=cicese_data.get('chlorophyll'),
-            salinity=cicese_data.get('salinity'),
-            current_speed=cicese_data.get('current_speed'),
-            current_direction=cicese_data.get('current_direction'),
-            data_source='cicese'
+        # Fetch every location concurrently and save them with one commit
+        results = _fetch_and_persist(
+            [(source, loc['latitude'], loc['longitude']) for loc in locations], user_id
         )
         
-        db.session.add(ocean_data)
-        db.session.commit()
-        
         return jsonify({
-            'message': 'CICESE data fetched and saved successfully',
-            'data': ocean_data.to_dict(),
-            'raw_data': cicese_data
+            'message': f'{OCEAN_SOURCES[source][1]} data fetched and saved successfully for {len(results)} locations',
+            'data': [saved for _, saved, _ in results],
+            'raw_data': [raw for _, _, raw in results]
         }), 200
         
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+# Every upstream reading for a location: response key, service class and method
+CONDITION_SOURCES = {
+    'noaa_ocean': (NOAAService, 'get_ocean_data'),
+    'noaa_weather': (NOAAService, 'get_weather_data'),
+    'noaa_satellite': (NOAAService, 'get_satellite_data'),
+    'cicese_ocean': (CICESEService, 'get_ocean_data'),
+    'cicese_coastal': (CICESEService, 'get_coastal_data'),
+    'cicese_research': (CICESEService, 'get_research_data'),
+    'cicese_climate': (CICESEService, 'get_climate_data')
+}
+
+def fetch_conditions(latitude, longitude):
+    """
+    Query every upstream reading for a location concurrently
+    
+    The calls share FETCH_EXECUTOR, so the whole fetch takes about as long as
+    the slowest provider. Returns a dict keyed like CONDITION_SOURCES.
+    """
+    futures = {
+        key: FETCH_EXECUTOR.submit(getattr(get_service(service_class), method), latitude, longitude)
+        for key, (service_class, method) in CONDITION_SOURCES.items()
+    }
+    return {key: future.result() for key, future in futures.items()}
+
+@oceanographic_bp.route('/conditions', methods=['GET'])
+@jwt_required()
+def get_conditions():
+    try:
+        latitude = request.args.get('latitude', type=float)
+        longitude = request.args.get('longitude', type=float)
+        
+        if latitude is None or longitude is None:
+            return jsonify({'error': 'Latitude and longitude are required'}), 400
+        
+        return jsonify({
+            'data': fetch_conditions(latitude, longitude)
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# Heatmap points are aggregated into square bins of this size, in degrees
+HEATMAP_BIN_DEGREES = 0.1
+
+# Days of readings the heatmap covers by default, and at most
+HEATMAP_DEFAULT_DAYS = 7
+HEATMAP_MAX_DAYS = 30
+
+def _heatmap_days():
+    days = request.args.get('days', HEATMAP_DEFAULT_DAYS, type=int)
+    return min(max(days, 1), HEATMAP_MAX_DAYS)
+
+# Cache keys name every argument the response depends on, so adding one
+# can't serve another variant's entry; bump the version on format changes
 @oceanographic_bp.route('/heatmap', methods=['GET'])
-@cache.cached(timeout=300)  # Cache for 5 minutes
+@cache.cached(timeout=300, key_prefix=lambda: f"oceanographic:heatmap:v2:{_heatmap_days()}")  # Cache for 5 minutes
 def get_ocean_heatmap():
     try:
-        # Get recent ocean data for heatmap
-        recent_data = OceanData.query.filter(
-            OceanData.timestamp >= datetime.utcnow() - timedelta(days=7)
+        # Average recent temperatures per bin in the database, so the payload
+        # has one point per occupied bin rather than one per reading; bins are
+        # centred on the rounded coordinates, like the sardine heatmap's
+        lat_bin = (func.round(OceanData.latitude / HEATMAP_BIN_DEGREES) * HEATMAP_BIN_DEGREES).label('lat')
+        lng_bin = (func.round(OceanData.longitude / HEATMAP_BIN_DEGREES) * HEATMAP_BIN_DEGREES).label('lng')
+        bins = db.session.execute(
+            select(lat_bin, lng_bin, func.avg(OceanData.temperature), func.count())
+            .where(
+                OceanData.timestamp >= datetime.utcnow() - timedelta(days=_heatmap_days()),
+                OceanData.temperature.isnot(None)
+            )
+            .group_by(lat_bin, lng_bin)
         ).all()
         
-        heatmap_data = []
-        for data_point in recent_data:
-            if data_point.temperature is not None:
-                heatmap_data.append({
-                    'lat': data_point.latitude,
-                    'lng': data_point.longitude,
-                    'weight': data_point.temperature,
-                    'location': data_point.location
-                })
+        heatmap_data = [
+            {'lat': lat, 'lng': lng, 'weight': weight, 'count': count}
+            for lat, lng, weight, count in bins
+        ]
         
         return jsonify({
             'heatmap_data': heatmap_data,
@@ -294,66 +427,49 @@ def get_ocean_heatmap():
         return jsonify({'error': str(e)}), 500
 
 @oceanographic_bp.route('/stats', methods=['GET'])
-@cache.cached(timeout=3600)  # Cache for 1 hour
+@cache.cached(timeout=3600, key_prefix='oceanographic:stats:v1')  # Cache for 1 hour
 def get_ocean_stats():
     try:
-        # Get statistics for ocean data
-        stats = {
-            'total_data_points': OceanData.query.count(),
-            'data_sources': {},
-            'temperature_stats': {},
-            'chlorophyll_stats': {},
-            'recent_activity': {}
-        }
+        now = datetime.utcnow()
+        
+        # Per-source counts, folded into one JSON object by a scalar subquery
+        sources = select(OceanData.data_source, func.count().label('count'))\
+            .where(OceanData.data_source.isnot(None))\
+            .group_by(OceanData.data_source)\
+            .subquery()
+        
+        # Every statistic in one round trip, using FILTER for the recent counts
+        row = db.session.execute(select(
+            func.count().label('total'),
+            func.avg(OceanData.temperature).label('temp_avg'),
+            func.min(OceanData.temperature).label('temp_min'),
+            func.max(OceanData.temperature).label('temp_max'),
+            func.avg(OceanData.chlorophyll).label('chloro_avg'),
+            func.min(OceanData.chlorophyll).label('chloro_min'),
+            func.max(OceanData.chlorophyll).label('chloro_max'),
+            func.count().filter(OceanData.timestamp >= now - timedelta(hours=24)).label('last_24_hours'),
+            func.count().filter(OceanData.timestamp >= now - timedelta(days=7)).label('last_week'),
+            select(func.json_object_agg(sources.c.data_source, sources.c.count))
+                .scalar_subquery().label('data_sources')
+        ).select_from(OceanData)).one()
         
-        # Data sources distribution
-        from sqlalchemy import func
-        sources = db.session.query(
-            OceanData.data_source,
-            func.count(OceanData.id).label('count')
-        ).group_by(OceanData.data_source).all()
-        
-        for source, count in sources:
-            stats['data_sources'][source] = count
-        
-        # Temperature statistics
-        temp_stats = db.session.query(
-            func.avg(OceanData.temperature).label('avg'),
-            func.min(OceanData.temperature).label('min'),
-            func.max(OceanData.temperature).label('max')
-        ).filter(OceanData.temperature.isnot(None)).first()
-        
-        if temp_stats:
-            stats['temperature_stats'] = {
-                'average': round(temp_stats.avg, 2) if temp_stats.avg else None,
-                'minimum': temp_stats.min,
-                'maximum': temp_stats.max
-            }
-        
-        # Chlorophyll statistics
-        chloro_stats = db.session.query(
-            func.avg(OceanData.chlorophyll).label('avg'),
-            func.min(OceanData.chlorophyll).label('min'),
-            func.max(OceanData.chlorophyll).label('max')
-        ).filter(OceanData.chlorophyll.isnot(None)).first()
-        
-        if chloro_stats:
-            stats['chlorophyll_stats'] = {
-                'average': round(chloro_stats.avg, 3) if chloro_stats.avg else None,
-                'minimum': chloro_stats.min,
-                'maximum': chloro_stats.max
+        stats = {
+            'total_data_points': row.total,
+            'data_sources': row.data_sources or {},
+            'temperature_stats': {
+                'average': round(row.temp_avg, 2) if row.temp_avg else None,
+                'minimum': row.temp_min,
+                'maximum': row.temp_max
+            },
+            'chlorophyll_stats': {
+                'average': round(row.chloro_avg, 3) if row.chloro_avg else None,
+                'minimum': row.chloro_min,
+                'maximum': row.chloro_max
+            },
+            'recent_activity': {
+                'last_24_hours': row.last_24_hours,
+                'last_week': row.last_week
             }
-        
-        # Recent activity (last 24 hours)
-        recent_count = OceanData.query.filter(
-            OceanData.timestamp >= datetime.utcnow() - timedelta(hours=24)
-        ).count()
-        
-        stats['recent_activity'] = {
-            'last_24_hours': recent_count,
-            'last_week': OceanData.query.filter(
-                OceanData.timestamp >= datetime.utcnow() - timedelta(days=7)
-            ).count()
         }
         
         return jsonify(stats), 200
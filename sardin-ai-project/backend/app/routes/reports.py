@@ -1,78 +1,90 @@
-from flask import Blueprint, request, jsonify, send_file
+from flask import Blueprint, Response, current_app, request, jsonify, send_file, url_for
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app import db
+from app import db, get_service
 from app.models import Report
 from app.services.report_service import ReportService
+from app.tasks import generate_report_task
+from app.utils.json_utils import dumps
+from app.utils.pagination import keyset_page
+from app.utils.validation import ValidationError, json_body
+import hashlib
 import os
-from datetime import datetime
 
 reports_bp = Blueprint('reports', __name__)
 
+# Request fields passed through to report generation
+REPORT_PARAMS = ('session_id', 'start_date', 'end_date', 'location', 'species')
+
 @reports_bp.route('/generate', methods=['POST'])
 @jwt_required()
 def generate_report():
     try:
         user_id = get_jwt_identity()
-        data = request.get_json()
-        
-        required_fields = ['title', 'report_type', 'content_type']
-        for field in required_fields:
-            if field not in data:
-                return jsonify({'error': f'Missing required field: {field}'}), 400
+        data = json_body(['title', 'report_type', 'content_type'])
         
         title = data['title']
         report_type = data['report_type']  # pdf, markdown
         content_type = data['content_type']  # chat_analysis, oceanographic, fish_prediction, comprehensive
         
-        # Initialize report service
-        report_service = ReportService()
-        
-        # Generate report based on content type
-        if content_type == 'chat_analysis':
-            content = report_service.generate_chat_analysis_report(user_id, data.get('session_id'))
-        elif content_type == 'oceanographic':
-            content = report_service.generate_oceanographic_report(
-                data.get('start_date'), data.get('end_date'), data.get('location')
-            )
-        elif content_type == 'fish_prediction':
-            content = report_service.generate_fish_prediction_report(
-                data.get('species'), data.get('start_date'), data.get('end_date')
-            )
-        elif content_type == 'comprehensive':
-            content = report_service.generate_comprehensive_report(
-                data.get('start_date'), data.get('end_date'), data.get('location')
-            )
-        else:
+        if content_type not in ReportService.CONTENT_GENERATORS:
             return jsonify({'error': 'Invalid content type'}), 400
         
-        # Generate file based on report type
-        if report_type == 'markdown':
-            file_path = report_service.save_markdown_report(content, f"report_{user_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
-            report_content = content
-        elif report_type == 'pdf':
-            file_path = report_service.generate_pdf_report(content, f"report_{user_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
-            report_content = None
-        else:
+        if report_type not in ReportService.REPORT_WRITERS:
             return jsonify({'error': 'Invalid report type'}), 400
         
-        # Save report to database
+        params = {field: data.get(field) for field in REPORT_PARAMS}
+        
+        # ?sync=1 generates the report inline and returns it
+        if request.args.get('sync', 0, type=int):
+            content, file_path = get_service(ReportService).build_report(user_id, content_type, report_type, params)
+            
+            report = Report(
+                user_id=user_id,
+                title=title,
+                report_type=report_type,
+                content=content,
+                file_path=file_path,
+                file_status='present' if file_path else None
+            )
+            
+            db.session.add(report)
+            db.session.flush()
+            report_data = report.to_dict()
+            db.session.commit()
+            
+            return jsonify({
+                'message': 'Report generated successfully',
+                'report': report_data,
+                'content': content if report_type == 'markdown' else None
+            }), 201
+        
+        # Otherwise record a pending report and hand it to a worker, so the
+        # request doesn't hold a web worker while the report is rendered
         report = Report(
             user_id=user_id,
             title=title,
             report_type=report_type,
-            content=content,
-            file_path=file_path
+            content='',
+            status='pending'
         )
         
+        # Read the id before the commit expires the instance
         db.session.add(report)
+        db.session.flush()
+        report_id = report.id
         db.session.commit()
         
-        return jsonify({
-            'message': 'Report generated successfully',
-            'report': report.to_dict(),
-            'content': report_content
-        }), 201
+        generate_report_task.delay(report_id, content_type, params)
         
+        return jsonify({
+            'message': 'Report queued',
+            'report_id': report_id,
+            'status': 'pending',
+            'status_url': url_for('reports.get_report', report_id=report_id)
+        }), 202
+        
+    except ValidationError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -82,25 +94,26 @@ def generate_report():
 def get_reports():
     try:
         user_id = get_jwt_identity()
-        page = request.args.get('page', 1, type=int)
+        cursor = request.args.get('cursor')
         per_page = request.args.get('per_page', 20, type=int)
         report_type = request.args.get('report_type')
         
-        query = Report.query.filter_by(user_id=user_id)
+        query = Report.json_select().where(Report.user_id == user_id)
         
         if report_type:
-            query = query.filter_by(report_type=report_type)
+            query = query.where(Report.report_type == report_type)
         
-        reports = query.order_by(Report.generated_at.desc())\
-            .paginate(page=page, per_page=per_page, error_out=False)
+        reports, next_cursor = keyset_page(
+            query, Report.generated_at, Report.id, cursor, per_page
+        )
         
         return jsonify({
-            'reports': [report.to_dict() for report in reports.items],
-            'total': reports.total,
-            'pages': reports.pages,
-            'current_page': page
+            'reports': [Report.row_to_dict(row) for row in reports],
+            'next_cursor': next_cursor
         }), 200
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -116,43 +129,63 @@ def get_report(report_id):
         
         return jsonify({
             'report': report.to_dict(),
-            'content': report.content if report.report_type == 'markdown' else None
+            'content': report.content if report.report_type == 'markdown' and report.status == 'done' else None
         }), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def _send_report_file(file_path, download_name, mimetype):
+    """
+    Send a report file as an attachment
+    
+    When REPORTS_ACCEL_REDIRECT_PREFIX is set, nginx serves the file body
+    from its internal location of that name via X-Accel-Redirect, so the
+    worker is freed immediately. Otherwise send_file streams it, or hands it
+    to Apache when USE_X_SENDFILE is enabled.
+    """
+    prefix = current_app.config.get('REPORTS_ACCEL_REDIRECT_PREFIX')
+    if not prefix:
+        file_path = get_service(ReportService).report_file(file_path)
+        return send_file(file_path, as_attachment=True, download_name=download_name, mimetype=mimetype)
+    
+    response = Response(status=200, mimetype=mimetype)
+    response.headers['X-Accel-Redirect'] = f"{prefix.rstrip('/')}/{os.path.basename(file_path)}"
+    response.headers.set('Content-Disposition', 'attachment', filename=download_name)
+    return response
+
 @reports_bp.route('/<int:report_id>/download', methods=['GET'])
 @jwt_required()
 def download_report(report_id):
     try:
         user_id = get_jwt_identity()
-        report = Report.query.filter_by(id=report_id, user_id=user_id).first()
+        
+        # Only the columns the download uses; the content can be large
+        report = db.session.execute(
+            db.select(Report.title, Report.report_type, Report.file_path, Report.file_status)
+            .filter_by(id=report_id, user_id=user_id)
+        ).first()
         
         if not report:
             return jsonify({'error': 'Report not found'}), 404
         
-        if not report.file_path or not os.path.exists(report.file_path):
+        # File state is tracked in the row, so no stat() is needed here
+        if report.file_status != 'present':
             return jsonify({'error': 'Report file not found'}), 404
         
         # Determine file type and set appropriate headers
         if report.report_type == 'pdf':
-            return send_file(
-                report.file_path,
-                as_attachment=True,
-                download_name=f"{report.title}.pdf",
-                mimetype='application/pdf'
-            )
+            return _send_report_file(report.file_path, f"{report.title}.pdf", 'application/pdf')
         elif report.report_type == 'markdown':
-            return send_file(
-                report.file_path,
-                as_attachment=True,
-                download_name=f"{report.title}.md",
-                mimetype='text/markdown'
-            )
+            if report.file_path.endswith('.gz'):
+                return _send_report_file(report.file_path, f"{report.title}.md.gz", 'application/gzip')
+            return _send_report_file(report.file_path, f"{report.title}.md", 'text/markdown')
         else:
             return jsonify({'error': 'Unsupported report type'}), 400
         
+    except FileNotFoundError:
+        # Removed since the last reconcile_report_files run
+        return jsonify({'error': 'Report file not found'}), 404
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -161,19 +194,27 @@ def download_report(report_id):
 def delete_report(report_id):
     try:
         user_id = get_jwt_identity()
-        report = Report.query.filter_by(id=report_id, user_id=user_id).first()
         
-        if not report:
-            return jsonify({'error': 'Report not found'}), 404
+        # Delete in one statement without loading the row, getting back
+        # the file path to clean up
+        deleted = db.session.execute(
+            db.delete(Report).filter_by(id=report_id, user_id=user_id)
+            .returning(Report.file_path, Report.file_status)
+        ).first()
         
-        # Delete file if it exists
-        if report.file_path and os.path.exists(report.file_path):
-            os.remove(report.file_path)
+        if not deleted:
+            db.session.rollback()
+            return jsonify({'error': 'Report not found'}), 404
         
-        # Delete report from database
-        db.session.delete(report)
         db.session.commit()
         
+        # Delete the file, once the row is gone
+        if deleted.file_status == 'present':
+            try:
+                os.remove(get_service(ReportService).report_file(deleted.file_path))
+            except FileNotFoundError:
+                pass
+        
         return jsonify({
             'message': 'Report deleted successfully'
         }), 200
@@ -182,87 +223,71 @@ def delete_report(report_id):
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+# Report templates offered to clients, with the fields each one uses
+REPORT_TEMPLATES = [
+    {
+        'id': 'chat_analysis',
+        'name': 'Chat Analysis Report',
+        'description': 'Comprehensive analysis of chat conversations with sentiment and topic analysis',
+        'required_fields': ['session_id']
+    },
+    {
+        'id': 'oceanographic',
+        'name': 'Oceanographic Data Report',
+        'description': 'Analysis of oceanographic data including temperature, chlorophyll, and currents',
+        'required_fields': ['start_date', 'end_date'],
+        'optional_fields': ['location']
+    },
+    {
+        'id': 'fish_prediction',
+        'name': 'Fish Prediction Report',
+        'description': 'Summary of fish location predictions and accuracy analysis',
+        'required_fields': ['species', 'start_date', 'end_date']
+    },
+    {
+        'id': 'comprehensive',
+        'name': 'Comprehensive Fisheries Report',
+        'description': 'Complete report including oceanographic data, fish predictions, and vessel tracking',
+        'required_fields': ['start_date', 'end_date'],
+        'optional_fields': ['location']
+    }
+]
+
+# The templates never change, so the response body and its ETag are built
+# once; clients revalidating with If-None-Match get a 304
+_TEMPLATES_BODY = dumps({'templates': REPORT_TEMPLATES})
+_TEMPLATES_ETAG = hashlib.sha1(_TEMPLATES_BODY.encode()).hexdigest()
+
 @reports_bp.route('/templates', methods=['GET'])
 @jwt_required()
 def get_report_templates():
-    try:
-        templates = [
-            {
-                'id': 'chat_analysis',
-                'name': 'Chat Analysis Report',
-                'description': 'Comprehensive analysis of chat conversations with sentiment and topic analysis',
-                'required_fields': ['session_id']
-            },
-            {
-                'id': 'oceanographic',
-                'name': 'Oceanographic Data Report',
-                'description': 'Analysis of oceanographic data including temperature, chlorophyll, and currents',
-                'required_fields': ['start_date', 'end_date'],
-                'optional_fields': ['location']
-            },
-            {
-                'id': 'fish_prediction',
-                'name': 'Fish Prediction Report',
-                'description': 'Summary of fish location predictions and accuracy analysis',
-                'required_fields': ['species', 'start_date', 'end_date']
-            },
-            {
-                'id': 'comprehensive',
-                'name': 'Comprehensive Fisheries Report',
-                'description': 'Complete report including oceanographic data, fish predictions, and vessel tracking',
-                'required_fields': ['start_date', 'end_date'],
-                'optional_fields': ['location']
-            }
-        ]
-        
-        return jsonify({
-            'templates': templates
-        }), 200
-        
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    response = Response(_TEMPLATES_BODY, mimetype='application/json')
+    response.set_etag(_TEMPLATES_ETAG)
+    response.cache_control.public = True
+    response.cache_control.max_age = 3600
+    return response.make_conditional(request)
 
 @reports_bp.route('/preview', methods=['POST'])
 @jwt_required()
 def preview_report():
     try:
         user_id = get_jwt_identity()
-        data = request.get_json()
-        
-        required_fields = ['template_id', 'parameters']
-        for field in required_fields:
-            if field not in data:
-                return jsonify({'error': f'Missing required field: {field}'}), 400
+        data = json_body(['template_id', 'parameters'])
         
         template_id = data['template_id']
         parameters = data['parameters']
         
-        # Initialize report service
-        report_service = ReportService()
-        
-        # Generate preview based on template
-        if template_id == 'chat_analysis':
-            preview = report_service.generate_chat_analysis_preview(
-                user_id, parameters.get('session_id')
-            )
-        elif template_id == 'oceanographic':
-            preview = report_service.generate_oceanographic_preview(
-                parameters.get('start_date'), parameters.get('end_date'), parameters.get('location')
-            )
-        elif template_id == 'fish_prediction':
-            preview = report_service.generate_fish_prediction_preview(
-                parameters.get('species'), parameters.get('start_date'), parameters.get('end_date')
-            )
-        elif template_id == 'comprehensive':
-            preview = report_service.generate_comprehensive_preview(
-                parameters.get('start_date'), parameters.get('end_date'), parameters.get('location')
-            )
-        else:
+        if template_id not in ReportService.CONTENT_GENERATORS:
             return jsonify({'error': 'Invalid template ID'}), 400
         
+        # The preview is the report's content, generated without saving a file
+        preview = get_service(ReportService).generate_content(template_id, user_id, parameters)
+        
         return jsonify({
             'preview': preview
         }), 200
         
+    except ValidationError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
\ No newline at end of file
@@ -0,0 +1,26 @@
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Connections kept alive per upstream host
+HTTP_POOL_MAXSIZE = 32
+
+def create_session(pool_maxsize: int = HTTP_POOL_MAXSIZE) -> requests.Session:
+    """
+    Create a requests session with a keep-alive connection pool that retries
+    transient upstream errors
+    """
+    retry = Retry(
+        total=3,
+        backoff_factor=0.2,
+        status_forcelist=(502, 503, 504)
+    )
+    adapter = HTTPAdapter(pool_connections=8, pool_maxsize=pool_maxsize, max_retries=retry)
+    
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+# Shared by every external data service so repeated calls reuse connections
+SESSION = create_session()
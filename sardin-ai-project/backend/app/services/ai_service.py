@@ -1,26 +1,171 @@
 import openai
+import hashlib
 import json
 import re
-from textblob import TextBlob
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import Dict, List, Any
 import os
+from app import rcache_get, rcache_set
+
+# Seconds an OpenAI completion is reused for an identical request
+LLM_CACHE_TTL = 3600
+
+# Keywords counted by extract_topics: whole words of four or more letters
+KEYWORD_RE = re.compile(r'\b[a-zA-Z]{4,}\b')
+
+# Characters of chat text given to VADER and the keyword counter
+MAX_SENTIMENT_CHARS = 8000
+
+@lru_cache(maxsize=None)
+def _vader():
+    """
+    Lexicon-based sentiment scorer, loaded on first use and kept per process
+    """
+    from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+    return SentimentIntensityAnalyzer()
+
+# Runs of six or more of the same symbol or emoji, shortened to three before
+# scoring; VADER slows down and skews on long emoji runs
+REPEATED_SYMBOL_RE = re.compile(r'(\W)\1{5,}')
+
+def _concat_budget(contents: List[str], max_chars: int, start: int = 0) -> str:
+    """
+    Return " ".join(contents)[start:start + max_chars]
+    
+    Only the messages overlapping that window are joined, so a slice of a
+    long chat never builds the whole conversation string.
+    """
+    parts = []
+    offset = 0  # Position of the next message in the joined text
+    first = None
+    for content in contents:
+        if first is None:
+            if offset + len(content) + 1 <= start:
+                offset += len(content) + 1
+                continue
+            first = offset
+        parts.append(content)
+        offset += len(content) + 1
+        if offset - start > max_chars:
+            break
+    
+    skip = start - first if first is not None else 0
+    return " ".join(parts)[skip:skip + max_chars]
+
+def _sample_text(chat_data: List[Dict[str, Any]], limit: int = MAX_SENTIMENT_CHARS) -> str:
+    """
+    Join message contents, keeping at most limit characters
+    
+    Longer chats are represented by their beginning, middle and end so the
+    sample still spans the whole conversation.
+    """
+    contents = [msg.get('content', '') for msg in chat_data if msg.get('content')]
+    total = sum(len(content) for content in contents) + max(len(contents) - 1, 0)
+    if total <= limit:
+        return " ".join(contents)
+    
+    part = limit // 3
+    middle = (total - part) // 2
+    return " ".join(
+        _concat_budget(contents, part, start) for start in (0, middle, total - part)
+    )
 
 class AIService:
-    def __init__(self):
+    # Analysis types and the methods that perform them
+    ANALYSIS_METHODS = {
+        'sentiment': 'analyze_sentiment',
+        'topics': 'extract_topics',
+        'summary': 'generate_summary',
+        'all': 'analyze_all'
+    }
+    
+    # Analyses that make up 'all', keyed by their result section
+    COMBINED_ANALYSES = ('sentiment', 'topics', 'summary')
+    
+    def __init__(self, llm_cache_ttl: int = LLM_CACHE_TTL):
         openai.api_key = os.environ.get('OPENAI_API_KEY')
+        self.llm_cache_ttl = llm_cache_ttl
+    
+    def _cached_chat(self, system: str, prompt: str, max_tokens: int,
+                     model: str = "gpt-3.5-turbo", temperature: float = 0.3) -> str:
+        """
+        Return the chat completion for a system and user prompt
+        
+        Identical requests within llm_cache_ttl seconds are answered from Redis,
+        shared by every web and worker process, without calling OpenAI. If Redis
+        is unavailable the request goes to OpenAI uncached.
+        """
+        digest = hashlib.blake2b(
+            f"{model}|{system}|{prompt}|{max_tokens}|{temperature}".encode(), digest_size=16
+        ).hexdigest()
+        key = f"llm:{digest}"
+        
+        try:
+            cached = rcache_get(key)
+        except Exception as e:
+            print(f"LLM cache unavailable: {e}")
+            cached = None
+        if cached is not None:
+            return cached
+        
+        response = openai.ChatCompletion.create(
+            model=model,
+            messages=[
+                {"role": "system", "content": system},
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=max_tokens,
+            temperature=temperature
+        )
+        content = response.choices[0].message.content
+        
+        try:
+            rcache_set(key, content, ex=self.llm_cache_ttl)
+        except Exception as e:
+            print(f"LLM cache unavailable: {e}")
+        return content
+    
+    def run_analysis(self, analysis_type: str, chat_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Run the analysis named by analysis_type on chat data
+        """
+        return getattr(self, self.ANALYSIS_METHODS[analysis_type])(chat_data)
+    
+    def analyze_all(self, chat_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Run the sentiment, topic and summary analyses concurrently
+        
+        Their OpenAI calls overlap, so this takes about as long as the slowest
+        one. Each analysis reports its own failures, so one failing doesn't
+        affect the others.
+        """
+        with ThreadPoolExecutor(max_workers=len(self.COMBINED_ANALYSES)) as executor:
+            futures = {
+                analysis_type: executor.submit(self.run_analysis, analysis_type, chat_data)
+                for analysis_type in self.COMBINED_ANALYSES
+            }
+        
+        results = {analysis_type: future.result() for analysis_type, future in futures.items()}
+        results['confidence_score'] = round(
+            sum(result.get('confidence_score', 0.0) for result in results.values()) / len(results), 2
+        )
+        return results
         
     def analyze_sentiment(self, chat_data: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
-        Analyze sentiment of chat conversations using TextBlob and OpenAI
+        Analyze sentiment of chat conversations using VADER and OpenAI
         """
         try:
-            # Combine all messages for analysis
-            combined_text = " ".join([msg.get('content', '') for msg in chat_data if msg.get('content')])
+            # Combine messages for analysis, capped at MAX_SENTIMENT_CHARS
+            combined_text = _sample_text(chat_data)
             
-            # Basic sentiment analysis with TextBlob
-            blob = TextBlob(combined_text)
-            sentiment_polarity = blob.sentiment.polarity
-            sentiment_subjectivity = blob.sentiment.subjectivity
+            # Basic sentiment analysis with VADER; subjectivity is the share
+            # of the text scored as positive or negative
+            scores = _vader().polarity_scores(REPEATED_SYMBOL_RE.sub(r'\1\1\1', combined_text))
+            sentiment_polarity = scores['compound']
+            sentiment_subjectivity = round(1 - scores['neu'], 3)
             
             # Determine sentiment category
             if sentiment_polarity > 0.1:
@@ -48,17 +193,9 @@ class AIService:
                     4. Sentiment progression over time
                     """
                     
-                    response = openai.ChatCompletion.create(
-                        model="gpt-3.5-turbo",
-                        messages=[
-                            {"role": "system", "content": "You are a sentiment analysis expert."},
-                            {"role": "user", "content": prompt}
-                        ],
-                        max_tokens=500,
-                        temperature=0.3
+                    enhanced_analysis = self._cached_chat(
+                        "You are a sentiment analysis expert.", prompt, max_tokens=500
                     )
-                    
-                    enhanced_analysis = response.choices[0].message.content
                     confidence_score = 0.9
                     
                 except Exception as e:
@@ -85,17 +222,14 @@ class AIService:
         Extract main topics from chat conversations
         """
         try:
-            # Combine all messages for analysis
-            combined_text = " ".join([msg.get('content', '') for msg in chat_data if msg.get('content')])
+            # Combine messages for analysis, capped at MAX_SENTIMENT_CHARS
+            combined_text = _sample_text(chat_data)
             
             # Basic keyword extraction
-            words = re.findall(r'\b[a-zA-Z]{4,}\b', combined_text.lower())
-            word_freq = {}
-            for word in words:
-                word_freq[word] = word_freq.get(word, 0) + 1
+            word_freq = Counter(KEYWORD_RE.findall(combined_text.lower()))
             
-            # Get top keywords
-            top_keywords = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)[:10]
+            # Get top keywords; a partial heap selection, not a full sort
+            top_keywords = word_freq.most_common(10)
             
             # Enhanced topic extraction with OpenAI if available
             enhanced_topics = None
@@ -115,17 +249,9 @@ class AIService:
                     4. Topic importance ranking
                     """
                     
-                    response = openai.ChatCompletion.create(
-                        model="gpt-3.5-turbo",
-                        messages=[
-                            {"role": "system", "content": "You are a topic analysis expert."},
-                            {"role": "user", "content": prompt}
-                        ],
-                        max_tokens=500,
-                        temperature=0.3
+                    enhanced_topics = self._cached_chat(
+                        "You are a topic analysis expert.", prompt, max_tokens=500
                     )
-                    
-                    enhanced_topics = response.choices[0].message.content
                     confidence_score = 0.85
                     
                 except Exception as e:
@@ -135,8 +261,8 @@ class AIService:
                 'top_keywords': top_keywords,
                 'enhanced_topics': enhanced_topics,
                 'confidence_score': confidence_score,
-                'total_words': len(words),
-                'unique_words': len(set(words))
+                'total_words': sum(word_freq.values()),
+                'unique_words': len(word_freq)
             }
             
         except Exception as e:
@@ -151,21 +277,31 @@ class AIService:
         Generate a comprehensive summary of the chat conversation
         """
         try:
-            # Basic statistics
+            # Word count, participants, time span and the prompt excerpt
+            # (first 20 messages, for API limits) in one pass over the chat
             total_messages = len(chat_data)
-            total_words = sum(len(msg.get('content', '').split()) for msg in chat_data)
+            total_words = 0
+            participants = set()
+            start = end = None
+            formatted_conversation = []
             
-            # Extract participants
-            participants = list(set(msg.get('author', 'Unknown') for msg in chat_data))
+            for i, msg in enumerate(chat_data):
+                author = msg.get('author', 'Unknown')
+                content = msg.get('content', '')
+                timestamp = msg.get('timestamp')
+                
+                total_words += len(content.split())
+                participants.add(author)
+                if timestamp:
+                    if start is None or timestamp < start:
+                        start = timestamp
+                    if end is None or timestamp > end:
+                        end = timestamp
+                if i < 20:
+                    formatted_conversation.append(f"{author}: {content}")
             
-            # Time span
-            timestamps = [msg.get('timestamp') for msg in chat_data if msg.get('timestamp')]
-            time_span = None
-            if timestamps:
-                time_span = {
-                    'start': min(timestamps),
-                    'end': max(timestamps)
-                }
+            participants = list(participants)
+            time_span = {'start': start, 'end': end} if start is not None else None
             
             # Enhanced summary with OpenAI if available
             enhanced_summary = None
@@ -173,13 +309,6 @@ class AIService:
             
             if openai.api_key:
                 try:
-                    # Format conversation for analysis
-                    formatted_conversation = []
-                    for msg in chat_data[:20]:  # Limit to first 20 messages for API limits
-                        author = msg.get('author', 'Unknown')
-                        content = msg.get('content', '')
-                        formatted_conversation.append(f"{author}: {content}")
-                    
                     conversation_text = "\n".join(formatted_conversation)
                     
                     prompt = f"""
@@ -195,17 +324,9 @@ class AIService:
                     5. Overall conversation tone
                     """
                     
-                    response = openai.ChatCompletion.create(
-                        model="gpt-3.5-turbo",
-                        messages=[
-                            {"role": "system", "content": "You are an expert conversation summarizer."},
-                            {"role": "user", "content": prompt}
-                        ],
-                        max_tokens=600,
-                        temperature=0.3
+                    enhanced_summary = self._cached_chat(
+                        "You are an expert conversation summarizer.", prompt, max_tokens=600
                     )
-                    
-                    enhanced_summary = response.choices[0].message.content
                     confidence_score = 0.9
                     
                 except Exception as e:
@@ -3,14 +3,63 @@ import json
 from typing import Dict, List, Any, Optional
 from datetime import datetime, timedelta
 import os
+from app.services._http import SESSION
+from app.utils.location_cache import memoize_by_location
+from app.services.historical_series import HistoricalSeries
 import math
 import random
+import numpy as np
+
+_RNG = np.random.default_rng()
+
+# (low, high) bounds of the random variation in each simulated reading,
+# drawn for a whole response in one call
+OCEAN_NOISE = np.array([
+    (-0.3, 0.3),   # salinity
+    (-0.1, 0.1),   # current_speed
+    (-30, 30),     # current_direction
+    (-0.5, 0.5),   # dissolved_oxygen
+    (-0.1, 0.1),   # ph
+    (-0.5, 0.5)    # turbidity
+])
+COASTAL_NOISE = np.array([
+    (-0.5, 0.5),   # wave_height
+    (-2, 2),       # wave_period
+    (-30, 30),     # wave_direction
+    (-0.5, 0.5),   # water_level
+    (-0.1, 0.1),   # coastal_current_speed
+    (0, 360),      # coastal_current_direction
+    (2, 8)         # beach_slope
+])
+RESEARCH_NOISE = np.array([
+    (-0.5, 0.5),   # water_quality_index
+    (-0.1, 0.1)    # biodiversity_index
+])
+CLIMATE_NOISE = np.array([
+    (-2, 2),       # air_temperature
+    (-5, 5),       # sea_level_pressure
+    (-10, 10),     # relative_humidity
+    (-3, 3),       # wind_speed
+    (0, 360),      # wind_direction
+    (-100, 100),   # solar_radiation
+    (-2, 2),       # uv_index
+    (0, 5),        # precipitation
+    (-0.5, 0.5)    # evaporation_rate
+])
+
+def _noise(bounds: np.ndarray) -> List[float]:
+    """
+    Draw one uniform value per (low, high) row of bounds
+    """
+    return _RNG.uniform(bounds[:, 0], bounds[:, 1]).tolist()
 
 class CICESEService:
-    def __init__(self):
+    def __init__(self, session: Optional[requests.Session] = None):
+        self.session = session or SESSION
         self.api_key = os.environ.get('CICESE_API_KEY')
         self.base_url = "https://www.cicese.edu.mx/api"
         
+    @memoize_by_location('cicese:ocean')
     def get_ocean_data(self, latitude: float, longitude: float) -> Dict[str, Any]:
         """
         Fetch oceanographic data from CICESE for given coordinates
@@ -33,17 +82,18 @@ class CICESEService:
             hour_factor = math.sin(2 * math.pi * current_time.hour / 24)
             day_of_year = current_time.timetuple().tm_yday
             seasonal_factor = math.sin(2 * math.pi * day_of_year / 365)
+            salinity, speed, direction, oxygen, ph, turbidity = _noise(OCEAN_NOISE)
             
             ocean_data = {
                 'temperature': round(base_temp + lat_factor + hour_factor * 2 + seasonal_factor * 3, 1),
                 'chlorophyll': round(base_chlorophyll + lon_factor * 0.1 + seasonal_factor * 0.3, 2),
-                'salinity': round(base_salinity + random.uniform(-0.3, 0.3), 2),
-                'current_speed': round(0.6 + hour_factor * 0.4 + random.uniform(-0.1, 0.1), 1),
-                'current_direction': round((current_time.hour * 15 + random.uniform(-30, 30)) % 360, 0),
+                'salinity': round(base_salinity + salinity, 2),
+                'current_speed': round(0.6 + hour_factor * 0.4 + speed, 1),
+                'current_direction': round((current_time.hour * 15 + direction) % 360, 0),
                 'depth': 50.0,
-                'dissolved_oxygen': round(6.5 + random.uniform(-0.5, 0.5), 1),
-                'ph': round(8.1 + random.uniform(-0.1, 0.1), 1),
-                'turbidity': round(2.5 + random.uniform(-0.5, 0.5), 1),
+                'dissolved_oxygen': round(6.5 + oxygen, 1),
+                'ph': round(8.1 + ph, 1),
+                'turbidity': round(2.5 + turbidity, 1),
                 'data_source': 'cicese',
                 'timestamp': current_time.isoformat(),
                 'location': f"CICESE Data ({latitude}, {longitude})",
@@ -61,54 +111,49 @@ class CICESEService:
             }
     
     def get_historical_data(self, latitude: float, longitude: float, 
-                           start_date: datetime, end_date: datetime) -> List[Dict[str, Any]]:
+                           start_date: datetime, end_date: datetime) -> HistoricalSeries:
         """
-        Fetch historical oceanographic data from CICESE
+        Fetch historical oceanographic data from CICESE as daily column arrays
         """
         try:
-            historical_data = []
-            current_date = start_date
-            
-            while current_date <= end_date:
-                day_of_year = current_date.timetuple().tm_yday
-                
-                # Seasonal patterns for Ensenada region
-                # Temperature: cooler in winter (Dec-Feb), warmer in summer (Jun-Aug)
-                temp_seasonal = 4 * math.sin(2 * math.pi * (day_of_year - 80) / 365)
-                
-                # Chlorophyll: higher in spring (Mar-May) and fall (Sep-Nov)
-                chlor_seasonal = 0.4 * math.sin(4 * math.pi * (day_of_year - 60) / 365)
-                
-                # Upwelling effects (stronger in spring/summer)
-                upwelling_factor = 0.3 if 80 <= day_of_year <= 200 else 0.1
-                
-                base_temp = 18.5 + temp_seasonal
-                base_chlorophyll = 0.85 + chlor_seasonal + upwelling_factor
-                
-                data_point = {
-                    'temperature': round(base_temp + random.uniform(-0.5, 0.5), 1),
-                    'chlorophyll': round(base_chlorophyll + random.uniform(-0.1, 0.1), 2),
-                    'salinity': round(34.2 + random.uniform(-0.3, 0.3), 2),
-                    'current_speed': round(0.6 + random.uniform(-0.2, 0.2), 1),
-                    'current_direction': round(random.uniform(0, 360), 0),
-                    'dissolved_oxygen': round(6.5 + random.uniform(-0.3, 0.3), 1),
-                    'ph': round(8.1 + random.uniform(-0.1, 0.1), 1),
-                    'turbidity': round(2.5 + random.uniform(-0.3, 0.3), 1),
-                    'depth': 50.0,
-                    'data_source': 'cicese',
-                    'timestamp': current_date.isoformat(),
-                    'location': f"CICESE Historical ({latitude}, {longitude})",
-                    'region': 'ensenada_bc',
-                    'day_of_year': day_of_year
-                }
-                
-                historical_data.append(data_point)
-                current_date += timedelta(days=1)
-            
-            return historical_data
+            # The whole range is computed at once, one array per field
+            days = max((end_date - start_date).days + 1, 0)
+            dates = [start_date + timedelta(days=i) for i in range(days)]
+            calendar_days = np.array([d.date() for d in dates], dtype='datetime64[D]')
+            day_of_year = (calendar_days - calendar_days.astype('datetime64[Y]')).astype(int) + 1
+            
+            # Seasonal patterns for Ensenada region
+            # Temperature: cooler in winter (Dec-Feb), warmer in summer (Jun-Aug)
+            temp_seasonal = 4 * np.sin(2 * np.pi * (day_of_year - 80) / 365)
+            
+            # Chlorophyll: higher in spring (Mar-May) and fall (Sep-Nov)
+            chlor_seasonal = 0.4 * np.sin(4 * np.pi * (day_of_year - 60) / 365)
+            
+            # Upwelling effects (stronger in spring/summer)
+            upwelling_factor = np.where((day_of_year >= 80) & (day_of_year <= 200), 0.3, 0.1)
+            
+            base_temp = 18.5 + temp_seasonal
+            base_chlorophyll = 0.85 + chlor_seasonal + upwelling_factor
+            
+            return HistoricalSeries(
+                timestamps=np.array(dates, dtype='datetime64[us]'),
+                temperature=np.round(base_temp + _RNG.uniform(-0.5, 0.5, days), 1),
+                chlorophyll=np.round(base_chlorophyll + _RNG.uniform(-0.1, 0.1, days), 2),
+                salinity=np.round(34.2 + _RNG.uniform(-0.3, 0.3, days), 2),
+                current_speed=np.round(0.6 + _RNG.uniform(-0.2, 0.2, days), 1),
+                current_direction=np.round(_RNG.uniform(0, 360, days), 0),
+                dissolved_oxygen=np.round(6.5 + _RNG.uniform(-0.3, 0.3, days), 1),
+                ph=np.round(8.1 + _RNG.uniform(-0.1, 0.1, days), 1),
+                turbidity=np.round(2.5 + _RNG.uniform(-0.3, 0.3, days), 1),
+                depth=50.0,
+                data_source='cicese',
+                location=f"CICESE Historical ({latitude}, {longitude})",
+                region='ensenada_bc',
+                day_of_year=day_of_year
+            )
             
         except Exception as e:
-            return [{'error': str(e)}]
+            return HistoricalSeries.failed('cicese', str(e))
     
     def get_coastal_data(self, latitude: float, longitude: float) -> Dict[str, Any]:
         """
@@ -116,15 +161,16 @@ class CICESEService:
         """
         try:
             # Coastal data specific to Baja California region
+            height, period, direction, level, speed, current_direction, slope = _noise(COASTAL_NOISE)
             coastal_data = {
-                'wave_height': round(1.5 + random.uniform(-0.5, 0.5), 1),
-                'wave_period': round(8 + random.uniform(-2, 2), 1),
-                'wave_direction': round(270 + random.uniform(-30, 30), 0),  # Predominantly NW
-                'water_level': round(0.0 + random.uniform(-0.5, 0.5), 2),  # Relative to mean sea level
-                'coastal_current_speed': round(0.3 + random.uniform(-0.1, 0.1), 1),
-                'coastal_current_direction': round(random.uniform(0, 360), 0),
+                'wave_height': round(1.5 + height, 1),
+                'wave_period': round(8 + period, 1),
+                'wave_direction': round(270 + direction, 0),  # Predominantly NW
+                'water_level': round(0.0 + level, 2),  # Relative to mean sea level
+                'coastal_current_speed': round(0.3 + speed, 1),
+                'coastal_current_direction': round(current_direction, 0),
                 'sediment_type': random.choice(['sand', 'rock', 'gravel', 'mud']),
-                'beach_slope': round(random.uniform(2, 8), 1),
+                'beach_slope': round(slope, 1),
                 'data_source': 'cicese-coastal',
                 'timestamp': datetime.utcnow().isoformat(),
                 'location': f"CICESE Coastal ({latitude}, {longitude})",
@@ -146,6 +192,7 @@ class CICESEService:
         """
         try:
             # Research station data
+            water_quality, biodiversity = _noise(RESEARCH_NOISE)
             research_data = {
                 'station_name': f"CICESE Marine Station {int(abs(latitude * 100))}",
                 'research_projects': [
@@ -154,8 +201,8 @@ class CICESEService:
                     'Fish Population Dynamics',
                     'Coastal Erosion Research'
                 ],
-                'water_quality_index': round(7.5 + random.uniform(-0.5, 0.5), 1),
-                'biodiversity_index': round(0.75 + random.uniform(-0.1, 0.1), 2),
+                'water_quality_index': round(7.5 + water_quality, 1),
+                'biodiversity_index': round(0.75 + biodiversity, 2),
                 'pollution_level': random.choice(['low', 'moderate', 'high']),
                 'research_vessels': [
                     {
@@ -190,17 +237,19 @@ class CICESEService:
         """
         try:
             current_time = datetime.utcnow()
+            (air_temperature, pressure, humidity, wind_speed, wind_direction,
+             radiation, uv_index, precipitation, evaporation) = _noise(CLIMATE_NOISE)
             
             climate_data = {
-                'air_temperature': round(22.0 + (latitude - 32) * 0.5 + random.uniform(-2, 2), 1),
-                'sea_level_pressure': round(1013.25 + random.uniform(-5, 5), 1),
-                'relative_humidity': round(65 + random.uniform(-10, 10), 0),
-                'wind_speed': round(8 + random.uniform(-3, 3), 1),
-                'wind_direction': round(random.uniform(0, 360), 0),
-                'solar_radiation': round(800 + random.uniform(-100, 100), 0),
-                'uv_index': round(6 + random.uniform(-2, 2), 0),
-                'precipitation': round(random.uniform(0, 5), 1),
-                'evaporation_rate': round(3.5 + random.uniform(-0.5, 0.5), 1),
+                'air_temperature': round(22.0 + (latitude - 32) * 0.5 + air_temperature, 1),
+                'sea_level_pressure': round(1013.25 + pressure, 1),
+                'relative_humidity': round(65 + humidity, 0),
+                'wind_speed': round(8 + wind_speed, 1),
+                'wind_direction': round(wind_direction, 0),
+                'solar_radiation': round(800 + radiation, 0),
+                'uv_index': round(6 + uv_index, 0),
+                'precipitation': round(precipitation, 1),
+                'evaporation_rate': round(3.5 + evaporation, 1),
                 'data_source': 'cicese-climate',
                 'timestamp': current_time.isoformat(),
                 'location': f"CICESE Climate ({latitude}, {longitude})",
@@ -0,0 +1,85 @@
+from dataclasses import dataclass
+from typing import Dict, List, Any, Optional
+import numpy as np
+
+@dataclass
+class HistoricalSeries:
+    """
+    Daily oceanographic history held column-wise, one array per field
+    
+    Aggregations work on the arrays directly (series.temperature.mean());
+    to_records() builds the per-day dicts only where JSON is needed.
+    """
+    timestamps: np.ndarray  # datetime64[us]
+    temperature: np.ndarray
+    chlorophyll: np.ndarray
+    salinity: np.ndarray
+    current_speed: np.ndarray
+    current_direction: np.ndarray
+    dissolved_oxygen: Optional[np.ndarray] = None
+    ph: Optional[np.ndarray] = None
+    turbidity: Optional[np.ndarray] = None
+    depth: float = 50.0
+    data_source: str = ''
+    location: str = ''
+    region: Optional[str] = None
+    day_of_year: Optional[np.ndarray] = None
+    error: Optional[str] = None
+    
+    # Per-day measurement columns, in record key order
+    MEASUREMENTS = ('temperature', 'chlorophyll', 'salinity', 'current_speed',
+                    'current_direction', 'dissolved_oxygen', 'ph', 'turbidity')
+    
+    @classmethod
+    def failed(cls, data_source: str, error: str) -> 'HistoricalSeries':
+        """
+        Empty series recording why the history could not be produced
+        """
+        empty = np.array([])
+        return cls(
+            timestamps=np.array([], dtype='datetime64[us]'),
+            temperature=empty, chlorophyll=empty, salinity=empty,
+            current_speed=empty, current_direction=empty,
+            data_source=data_source, error=error
+        )
+    
+    def __len__(self) -> int:
+        return len(self.timestamps)
+    
+    def columns(self) -> Dict[str, np.ndarray]:
+        """
+        Measurement arrays present in this series, keyed by field name
+        """
+        return {
+            name: getattr(self, name)
+            for name in self.MEASUREMENTS
+            if getattr(self, name) is not None
+        }
+    
+    def to_records(self) -> List[Dict[str, Any]]:
+        """
+        Materialize one dict per day for API responses
+        """
+        if self.error is not None:
+            return [{'error': self.error}]
+        
+        columns = {name: values.tolist() for name, values in self.columns().items()}
+        timestamps = self.timestamps.tolist()
+        day_of_year = self.day_of_year.tolist() if self.day_of_year is not None else None
+        
+        records = []
+        for i, timestamp in enumerate(timestamps):
+            record = {name: values[i] for name, values in columns.items()}
+            record.update({
+                'depth': self.depth,
+                'data_source': self.data_source,
+                'timestamp': timestamp.isoformat(),
+                'location': self.location
+            })
+            if self.region is not None:
+                record['region'] = self.region
+            if day_of_year is not None:
+                record['day_of_year'] = day_of_year[i]
+            records.append(record)
+        
+        return records
@@ -3,12 +3,20 @@ import json
 from typing import Dict, List, Any, Optional
 from datetime import datetime, timedelta
 import os
+from app.services._http import SESSION
+from app.utils.location_cache import memoize_by_location
+from app.services.historical_series import HistoricalSeries
+import numpy as np
+
+_RNG = np.random.default_rng()
 
 class NOAAService:
-    def __init__(self):
+    def __init__(self, session: Optional[requests.Session] = None):
+        self.session = session or SESSION
         self.api_key = os.environ.get('NOAA_API_KEY')
         self.base_url = "https://www.ncdc.noaa.gov/cdo-web/api/v2"
         
+    @memoize_by_location('noaa:ocean')
     def get_ocean_data(self, latitude: float, longitude: float) -> Dict[str, Any]:
         """
         Fetch oceanographic data from NOAA for given coordinates
@@ -49,48 +57,41 @@ class NOAAService:
             }
     
     def get_historical_data(self, latitude: float, longitude: float, 
-                           start_date: datetime, end_date: datetime) -> List[Dict[str, Any]]:
+                           start_date: datetime, end_date: datetime) -> HistoricalSeries:
         """
-        Fetch historical oceanographic data from NOAA
+        Fetch historical oceanographic data from NOAA as daily column arrays
         """
         try:
-            # Generate mock historical data
-            historical_data = []
-            current_date = start_date
+            # Generate mock historical data, one array per field
+            days = max((end_date - start_date).days + 1, 0)
+            dates = [start_date + timedelta(days=i) for i in range(days)]
+            calendar_days = np.array([d.date() for d in dates], dtype='datetime64[D]')
+            day_of_year = (calendar_days - calendar_days.astype('datetime64[Y]')).astype(int) + 1
+            
+            # Temperature varies seasonally
+            base_temp = 18.5 + 5 * np.sin(2 * np.pi * day_of_year / 365)
+            
+            # Add daily variation
+            daily_variation = 2 * np.sin(2 * np.pi * start_date.hour / 24)
+            temperature = base_temp + daily_variation
             
-            while current_date <= end_date:
-                # Simulate seasonal variations
-                day_of_year = current_date.timetuple().tm_yday
-                
-                # Temperature varies seasonally
-                base_temp = 18.5 + 5 * math.sin(2 * math.pi * day_of_year / 365)
-                
-                # Add daily variation
-                daily_variation = 2 * math.sin(2 * math.pi * current_date.hour / 24)
-                temperature = base_temp + daily_variation
-                
-                # Chlorophyll varies seasonally (higher in spring/fall)
-                chlorophyll = 0.8 + 0.4 * math.sin(4 * math.pi * day_of_year / 365)
-                
-                data_point = {
-                    'temperature': round(temperature, 1),
-                    'chlorophyll': round(chlorophyll, 2),
-                    'salinity': 34.2 + random.uniform(-0.5, 0.5),
-                    'current_speed': round(random.uniform(0.3, 1.2), 1),
-                    'current_direction': random.uniform(0, 360),
-                    'depth': 50.0,
-                    'data_source': 'noaa',
-                    'timestamp': current_date.isoformat(),
-                    'location': f"NOAA Historical ({latitude}, {longitude})"
-                }
-                
-                historical_data.append(data_point)
-                current_date += timedelta(days=1)
+            # Chlorophyll varies seasonally (higher in spring/fall)
+            chlorophyll = 0.8 + 0.4 * np.sin(4 * np.pi * day_of_year / 365)
             
-            return historical_data
+            return HistoricalSeries(
+                timestamps=np.array(dates, dtype='datetime64[us]'),
+                temperature=np.round(temperature, 1),
+                chlorophyll=np.round(chlorophyll, 2),
+                salinity=34.2 + _RNG.uniform(-0.5, 0.5, days),
+                current_speed=np.round(_RNG.uniform(0.3, 1.2, days), 1),
+                current_direction=_RNG.uniform(0, 360, days),
+                depth=50.0,
+                data_source='noaa',
+                location=f"NOAA Historical ({latitude}, {longitude})"
+            )
             
         except Exception as e:
-            return [{'error': str(e)}]
+            return HistoricalSeries.failed('noaa', str(e))
     
     def get_satellite_data(self, latitude: float, longitude: float, 
                           satellite_type: str = 'temperature') -> Dict[str, Any]:
@@ -139,7 +140,7 @@ class NOAAService:
                 'humidity': round(60 + (datetime.now().hour % 12) * 3, 0),
                 'wind_speed': round(5 + (datetime.now().hour % 8) * 0.5, 1),
                 'wind_direction': (datetime.now().hour * 30) % 360,
-                'pressure': 1013.25 + random.uniform(-5, 5),
+                'pressure': 1013.25 + _RNG.uniform(-5, 5),
                 'visibility': 10.0,
                 'data_source': 'noaa-weather',
                 'timestamp': datetime.utcnow().isoformat(),
@@ -11,10 +11,37 @@ import math
 import random
 
 class PredictionService:
+    # Process-wide instance populated by warmup(); under gunicorn --preload
+    # it is built in the master so forked workers share its pages
+    _shared = None
+    
     def __init__(self):
         self.models = {}
         self.scalers = {}
         self.load_models()
+    
+    @classmethod
+    def shared(cls) -> 'PredictionService':
+        """
+        Return the process-wide prediction service, creating it on first use
+        """
+        if cls._shared is None:
+            cls().warmup()
+        return cls._shared
+    
+    def warmup(self) -> 'PredictionService':
+        """
+        Register this instance as the shared service and freeze fitted arrays
+        
+        Marking model and scaler arrays read-only keeps request handlers from
+        writing to them, so copy-on-write pages stay shared between workers.
+        """
+        for estimator in (*self.models.values(), *self.scalers.values()):
+            for attr in vars(estimator).values():
+                if isinstance(attr, np.ndarray):
+                    attr.setflags(write=False)
+        type(self)._shared = self
+        return self
         
     def load_models(self):
         """
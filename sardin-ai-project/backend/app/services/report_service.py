@@ -4,16 +4,56 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.lib import colors
 import markdown
+from flask import current_app
 from datetime import datetime
 import os
-from typing import Dict, List, Any
+import gzip
+import uuid
+from typing import Dict, List, Any, Iterable, Iterator, Tuple, Union
 import json
 
 class ReportService:
+    # Report subjects and how to generate each from the requesting user
+    # and the request parameters
+    CONTENT_GENERATORS = {
+        'chat_analysis': lambda self, user_id, params: self.generate_chat_analysis_report(
+            user_id, params.get('session_id')
+        ),
+        'oceanographic': lambda self, user_id, params: self.generate_oceanographic_report(
+            params.get('start_date'), params.get('end_date'), params.get('location')
+        ),
+        'fish_prediction': lambda self, user_id, params: self.generate_fish_prediction_report(
+            params.get('species'), params.get('start_date'), params.get('end_date')
+        ),
+        'comprehensive': lambda self, user_id, params: self.generate_comprehensive_report(
+            params.get('start_date'), params.get('end_date'), params.get('location')
+        )
+    }
+    
+    # Output formats and the methods that save them
+    REPORT_WRITERS = {
+        'markdown': 'save_markdown_report',
+        'pdf': 'generate_pdf_report'
+    }
+    
     def __init__(self):
         self.styles = getSampleStyleSheet()
         self.setup_custom_styles()
     
+    @property
+    def reports_dir(self) -> str:
+        """Absolute directory report files are written to (REPORTS_DIR)"""
+        return current_app.config['REPORTS_DIR']
+    
+    def report_file(self, file_path: str) -> str:
+        """
+        Absolute path of a stored report file_path
+        
+        Reports generated before REPORTS_DIR stored paths relative to the
+        working directory; those are resolved against REPORTS_DIR too.
+        """
+        return os.path.join(self.reports_dir, os.path.basename(file_path))
+    
     def setup_custom_styles(self):
         """Setup custom styles for reports"""
         self.styles.add(ParagraphStyle(
@@ -39,12 +79,11 @@ class ReportService:
             spaceAfter=6
         ))
     
-    def generate_markdown_report(self, title: str, data: Any, analysis_results: List[Any] = None) -> str:
+    def iter_report_sections(self, title: str, data: Any, analysis_results: List[Any] = None) -> Iterator[str]:
         """
-        Generate a markdown report
+        Yield a markdown report section by section
         """
-        try:
-            report_content = f"""# {title}
+        yield f"""# {title}
 
 **Reporte Generado:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 **Sistema:** SARDIN-AI
@@ -61,23 +100,23 @@ Este reporte ha sido generado automáticamente por el sistema SARDIN-AI, el cual
 
 ### Información General
 """
-            
-            if isinstance(data, dict):
-                for key, value in data.items():
-                    report_content += f"**{key.replace('_', ' ').title()}:** {value}\n"
-            elif isinstance(data, list):
-                report_content += f"**Total de Registros:** {len(data)}\n"
-            
-            report_content += "\n### Análisis Detallado\n"
-            
-            if analysis_results:
-                for i, result in enumerate(analysis_results, 1):
-                    report_content += f"\n#### Análisis {i}\n"
-                    if isinstance(result, dict):
-                        for key, value in result.items():
-                            report_content += f"- **{key.replace('_', ' ').title()}:** {value}\n"
-            
-            report_content += f"""
+        
+        if isinstance(data, dict):
+            for key, value in data.items():
+                yield f"**{key.replace('_', ' ').title()}:** {value}\n"
+        elif isinstance(data, list):
+            yield f"**Total de Registros:** {len(data)}\n"
+        
+        yield "\n### Análisis Detallado\n"
+        
+        if analysis_results:
+            for i, result in enumerate(analysis_results, 1):
+                yield f"\n#### Análisis {i}\n"
+                if isinstance(result, dict):
+                    for key, value in result.items():
+                        yield f"- **{key.replace('_', ' ').title()}:** {value}\n"
+        
+        yield """
 
 ---
 
@@ -101,8 +140,38 @@ Basado en el análisis realizado, se pueden observar los siguientes puntos clave
 
 *Este reporte fue generado automáticamente por SARDIN-AI. Para más información, contacte al administrador del sistema.*
 """
-            
-            return report_content
+    
+    def generate_content(self, content_type: str, user_id: int, params: Dict[str, Any]) -> str:
+        """
+        Generate the markdown content of a report of the given content type
+        """
+        return self.CONTENT_GENERATORS[content_type](self, user_id, params)
+    
+    def build_report(self, user_id: int, content_type: str, report_type: str,
+                     params: Dict[str, Any], report_id: int = None) -> Tuple[str, str]:
+        """
+        Generate a report's markdown content and save it as report_type
+        
+        The file is named after report_id, or a random id when the report row
+        doesn't exist yet, so concurrent reports never share a file.
+        Returns the content and the saved file's path.
+        """
+        content = self.generate_content(content_type, user_id, params)
+        
+        if report_id is not None:
+            filename = f"report_{report_id}"
+        else:
+            filename = f"report_{user_id}_{uuid.uuid4().hex}"
+        file_path = getattr(self, self.REPORT_WRITERS[report_type])(content, filename)
+        
+        return content, file_path
+    
+    def generate_markdown_report(self, title: str, data: Any, analysis_results: List[Any] = None) -> str:
+        """
+        Generate a markdown report
+        """
+        try:
+            return ''.join(self.iter_report_sections(title, data, analysis_results))
             
         except Exception as e:
             return f"# Error generando reporte\n\nError: {str(e)}"
@@ -113,10 +182,10 @@ Basado en el análisis realizado, se pueden observar los siguientes puntos clave
         """
         try:
             # Create reports directory if it doesn't exist
-            os.makedirs('reports', exist_ok=True)
+            os.makedirs(self.reports_dir, exist_ok=True)
             
             # Generate PDF filename
-            pdf_filename = f"reports/{filename}.pdf"
+            pdf_filename = os.path.join(self.reports_dir, f"{filename}.pdf")
             
             # Create PDF document
             doc = SimpleDocTemplate(pdf_filename, pagesize=A4)
@@ -169,20 +238,22 @@ Basado en el análisis realizado, se pueden observar los siguientes puntos clave
             print(f"Error generating PDF: {e}")
             return ""
     
-    def save_markdown_report(self, content: str, filename: str) -> str:
+    def save_markdown_report(self, content: Union[str, Iterable[str]], filename: str) -> str:
         """
-        Save markdown content to file
+        Save markdown content, or an iterable of sections, to a gzipped file
         """
         try:
             # Create reports directory if it doesn't exist
-            os.makedirs('reports', exist_ok=True)
+            os.makedirs(self.reports_dir, exist_ok=True)
             
             # Generate markdown filename
-            md_filename = f"reports/{filename}.md"
+            md_filename = os.path.join(self.reports_dir, f"{filename}.md.gz")
             
-            # Save content to file
-            with open(md_filename, 'w', encoding='utf-8') as f:
-                f.write(content)
+            # Stream content to file without joining sections in memory
+            if isinstance(content, str):
+                content = (content,)
+            with gzip.open(md_filename, 'wt', encoding='utf-8', compresslevel=3) as f:
+                f.writelines(content)
             
             return md_filename
             
@@ -0,0 +1,195 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from celery import shared_task
+from flask import current_app
+from sqlalchemy.orm import selectinload
+from app import db, get_service
+from app.models import ChatAnalysis, FishPrediction, Report
+from app.services.ai_service import AIService
+from app.services.report_service import ReportService
+
+# Most pending analyses one task claims and runs together
+ANALYSIS_BATCH_SIZE = 32
+
+# Concurrent AI calls per batch; they spend their time waiting on the network
+ANALYSIS_CONCURRENCY = 8
+
+# Age after which a pending or running analysis is presumed lost, e.g. to a
+# killed worker; it is no longer joined and gets marked failed
+ANALYSIS_TIMEOUT = timedelta(minutes=15)
+
+# Age after which a pending or running report is presumed lost and marked failed
+REPORT_TIMEOUT = timedelta(minutes=30)
+
+# Report rows read per round trip while checking report files
+REPORT_FILE_BATCH_SIZE = 1000
+
+@shared_task(ignore_result=True)
+def analyze_chat_task(analysis_id: int):
+    """
+    Run pending chat analyses, starting with analysis_id, and store their results
+    
+    The task also claims other pending analyses, up to ANALYSIS_BATCH_SIZE,
+    so a burst of requests is served by a few tasks whose AI calls overlap.
+    Tasks whose analysis was already claimed by another find nothing to do.
+    """
+    # Claim the batch; SKIP LOCKED keeps concurrent tasks from claiming the same rows
+    analyses = db.session.scalars(
+        db.select(ChatAnalysis)
+        .where(ChatAnalysis.status == 'pending')
+        .order_by((ChatAnalysis.id == analysis_id).desc(), ChatAnalysis.id)
+        .limit(ANALYSIS_BATCH_SIZE)
+        .options(selectinload(ChatAnalysis.chat_session))
+        .with_for_update(skip_locked=True, of=ChatAnalysis)
+    ).all()
+    if not analyses:
+        db.session.rollback()
+        return
+    
+    jobs = [(analysis.id, analysis.analysis_type, analysis.chat_session.chat_data) for analysis in analyses]
+    for analysis in analyses:
+        analysis.status = 'running'
+    db.session.commit()
+    
+    ai_service = get_service(AIService)
+    with ThreadPoolExecutor(max_workers=min(len(jobs), ANALYSIS_CONCURRENCY)) as executor:
+        futures = [
+            executor.submit(ai_service.run_analysis, analysis_type, chat_data)
+            for _, analysis_type, chat_data in jobs
+        ]
+    
+    # Store every result with one executemany UPDATE by primary key
+    updates = []
+    for (job_id, _, _), future in zip(jobs, futures):
+        try:
+            result = future.result()
+            # The analysis methods report their own failures as an 'error' result
+            updates.append({
+                'id': job_id,
+                'result_data': result,
+                'confidence_score': result.get('confidence_score', 0.0),
+                'status': 'failed' if 'error' in result else 'done'
+            })
+        except Exception as e:
+            updates.append({'id': job_id, 'result_data': {'error': str(e)}, 'status': 'failed'})
+    
+    db.session.execute(db.update(ChatAnalysis), updates)
+    db.session.commit()
+
+@shared_task(ignore_result=True)
+def generate_report_task(report_id: int, content_type: str, params: dict):
+    """
+    Render a pending report and store its content and file
+    """
+    # Claim the report; a redelivered task finds it no longer pending
+    report = db.session.scalar(
+        db.select(Report)
+        .where(Report.id == report_id, Report.status == 'pending')
+        .with_for_update(skip_locked=True)
+    )
+    if report is None:
+        db.session.rollback()
+        return
+    
+    user_id, report_type = report.user_id, report.report_type
+    report.status = 'running'
+    db.session.commit()
+    
+    try:
+        content, file_path = get_service(ReportService).build_report(
+            user_id, content_type, report_type, params, report_id=report_id
+        )
+        values = {
+            'content': content,
+            'file_path': file_path,
+            'file_status': 'present' if file_path else None,
+            'status': 'done'
+        }
+    except Exception as e:
+        values = {'content': f"Error: {e}", 'status': 'failed'}
+    
+    db.session.execute(db.update(Report).where(Report.id == report_id).values(**values))
+    db.session.commit()
+
+@shared_task(ignore_result=True)
+def maintain_vessel_track_partitions():
+    """
+    Create the upcoming daily vessel track partitions and drop expired ones
+    """
+    db.session.execute(db.text("SELECT create_vessel_track_partitions()"))
+    db.session.execute(db.text("SELECT drop_old_vessel_track_partitions()"))
+    db.session.commit()
+
+@shared_task(ignore_result=True)
+def fail_stale_analyses():
+    """
+    Mark analyses stuck pending or running past ANALYSIS_TIMEOUT as failed
+    """
+    db.session.execute(
+        db.update(ChatAnalysis)
+        .where(
+            ChatAnalysis.status.in_(('pending', 'running')),
+            ChatAnalysis.created_at < datetime.utcnow() - ANALYSIS_TIMEOUT
+        )
+        .values(status='failed', result_data={'error': 'Analysis timed out'})
+    )
+    db.session.commit()
+
+@shared_task(ignore_result=True)
+def fail_stale_reports():
+    """
+    Mark reports stuck pending or running past REPORT_TIMEOUT as failed
+    """
+    db.session.execute(
+        db.update(Report)
+        .where(
+            Report.status.in_(('pending', 'running')),
+            Report.generated_at < datetime.utcnow() - REPORT_TIMEOUT
+        )
+        .values(status='failed', content='Error: Report generation timed out')
+    )
+    db.session.commit()
+
+@shared_task(ignore_result=True)
+def purge_expired_predictions():
+    """
+    Delete expired fish predictions so reads scan only live rows
+    """
+    db.session.execute(
+        db.delete(FishPrediction).where(FishPrediction.expires_at < datetime.utcnow())
+    )
+    db.session.commit()
+
+@shared_task(ignore_result=True)
+def reconcile_report_files():
+    """
+    Mark reports whose files have been removed or archived as purged
+    
+    Downloads trust file_status instead of checking the filesystem, so
+    this is the only place report files are stat()ed. Files are looked up
+    in REPORTS_DIR; if that directory is missing, e.g. the volume isn't
+    mounted on this worker, nothing is marked.
+    """
+    report_service = get_service(ReportService)
+    if not os.path.isdir(report_service.reports_dir):
+        current_app.logger.warning(
+            f"Reports directory {report_service.reports_dir} not found; skipping file reconciliation"
+        )
+        return
+    
+    reports = db.session.execute(
+        db.select(Report.id, Report.file_path)
+        .where(Report.file_status == 'present')
+        .execution_options(yield_per=REPORT_FILE_BATCH_SIZE)
+    )
+    purged = [
+        {'id': report_id, 'file_status': 'purged'}
+        for report_id, file_path in reports
+        if not os.path.exists(report_service.report_file(file_path))
+    ]
+    
+    # One executemany UPDATE by primary key
+    if purged:
+        db.session.execute(db.update(Report), purged)
+    db.session.commit()
@@ -0,0 +1,45 @@
+"""
+JSON helpers backed by orjson when it is installed, falling back to the
+standard library otherwise
+"""
+import decimal
+import json
+
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is listed in requirements.txt
+    orjson = None
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+def _default(obj):
+    """Serialize the types the encoders don't handle natively"""
+    if isinstance(obj, decimal.Decimal):
+        return str(obj)
+    if hasattr(obj, '__html__'):
+        return str(obj.__html__())
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def dumps(obj) -> str:
+    """Serialize obj to a compact JSON string"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS).decode()
+    return json.dumps(obj, default=_default, separators=(',', ':'))
+
+def loads(s):
+    """Deserialize a JSON str or bytes document"""
+    if orjson is not None:
+        return orjson.loads(s)
+    return json.loads(s)
+
+class ORJSONProvider(JSONProvider):
+    """Flask JSON provider that serializes jsonify() responses with orjson"""
+    
+    def dumps(self, obj, **kwargs) -> str:
+        return dumps(obj)
+    
+    def loads(self, s, **kwargs):
+        return loads(s)
@@ -0,0 +1,54 @@
+"""
+Redis memoization of upstream ocean data lookups by location and hour
+
+Ocean conditions change over hours, so a reading for a location is reused
+for every request that falls in the same ~1 km cell (coordinates rounded to
+0.01 degrees) within the same time bucket, instead of calling the upstream
+API again. Error responses are never cached.
+"""
+import logging
+import time
+from functools import wraps
+
+from app import rcache_get, rcache_set
+
+logger = logging.getLogger(__name__)
+
+# Decimal places kept from coordinates when building cache keys (~1 km)
+LOCATION_KEY_PRECISION = 2
+
+def memoize_by_location(prefix, ttl=3600):
+    """
+    Cache a get_*(self, latitude, longitude) method's JSON-serializable result
+    
+    Entries are keyed by the rounded coordinates and the current ttl-long time
+    bucket. Falls back to calling the method directly if Redis is unavailable.
+    Safe to use off the request thread; it needs no app context.
+    """
+    def decorator(fetch):
+        @wraps(fetch)
+        def wrapper(self, latitude, longitude):
+            bucket = int(time.time() // ttl)
+            key = (
+                f"{prefix}:{round(float(latitude), LOCATION_KEY_PRECISION)}:"
+                f"{round(float(longitude), LOCATION_KEY_PRECISION)}:{bucket}"
+            )
+            
+            try:
+                cached = rcache_get(key)
+            except Exception as e:
+                logger.warning(f"Cache unavailable for {key}: {e}")
+                return fetch(self, latitude, longitude)
+            
+            if cached is not None:
+                return cached
+            
+            result = fetch(self, latitude, longitude)
+            if 'error' not in result:
+                try:
+                    rcache_set(key, result, ex=ttl)
+                except Exception as e:
+                    logger.warning(f"Could not cache {key}: {e}")
+            return result
+        return wrapper
+    return decorator
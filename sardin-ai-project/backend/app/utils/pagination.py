@@ -0,0 +1,53 @@
+"""
+Keyset (seek) pagination over a (timestamp, id) sort key
+
+Each page is read with an index range scan that starts after the last row of
+the previous page, so deep pages cost the same as the first and no COUNT(*)
+over the filtered set is needed. Clients page by passing back next_cursor.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import tuple_
+
+from app import db
+
+def encode_cursor(timestamp: datetime, row_id: int) -> str:
+    """Encode a (timestamp, id) sort key as an opaque URL-safe cursor"""
+    payload = json.dumps([timestamp.isoformat(), row_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode a cursor from encode_cursor, raising ValueError if malformed"""
+    try:
+        timestamp, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except (binascii.Error, TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+def keyset_page(statement, sort_column, id_column, cursor: Optional[str],
+                per_page: int) -> Tuple[List[Any], Optional[str]]:
+    """
+    Return one page of rows from a Core SELECT, newest first, and the next cursor
+    
+    The SELECT must include sort_column and id_column. The next cursor is
+    None on the last page. One extra row is fetched to tell whether another
+    page follows.
+    """
+    per_page = max(1, per_page)
+    if cursor:
+        statement = statement.where(tuple_(sort_column, id_column) < decode_cursor(cursor))
+    
+    rows = db.session.execute(
+        statement.order_by(sort_column.desc(), id_column.desc()).limit(per_page + 1)
+    ).all()
+    
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, sort_column.key), getattr(last, id_column.key))
+    return rows, next_cursor
@@ -0,0 +1,61 @@
+"""
+Stale-while-revalidate caching for expensive, user-agnostic payloads
+
+A fresh entry is served as is. Once it is older than ttl it is still served
+for up to stale_ttl more seconds while a single background thread, elected
+through a Redis SET NX lock, recomputes it, so an expiry never sends every
+concurrent request to the database at once. Only a missing entry is
+computed in the request itself.
+"""
+import threading
+import time
+from functools import wraps
+
+from flask import current_app
+
+from app import get_redis, rcache_get, rcache_set
+
+def _store(key, payload, ttl, stale_ttl):
+    rcache_set(key, {'payload': payload, 'computed_at': time.time()}, ex=ttl + stale_ttl)
+
+def _refresh(app, compute, key, ttl, stale_ttl, lock_key):
+    with app.app_context():
+        try:
+            _store(key, compute(), ttl, stale_ttl)
+        except Exception as e:
+            app.logger.warning(f"Background refresh of {key} failed: {e}")
+        finally:
+            get_redis().delete(lock_key)
+
+def stale_while_revalidate(key, ttl, stale_ttl, lock_ttl=60):
+    """
+    Cache the JSON-serializable result of a zero-argument function under key
+    
+    Falls back to calling the function directly if Redis is unavailable.
+    """
+    lock_key = f"{key}:refresh-lock"
+    
+    def decorator(compute):
+        @wraps(compute)
+        def wrapper():
+            try:
+                entry = rcache_get(key)
+            except Exception as e:
+                current_app.logger.warning(f"Cache unavailable for {key}: {e}")
+                return compute()
+            
+            if entry is not None:
+                age = time.time() - entry['computed_at']
+                if age >= ttl and get_redis().set(lock_key, 1, nx=True, ex=lock_ttl):
+                    threading.Thread(
+                        target=_refresh,
+                        args=(current_app._get_current_object(), compute, key, ttl, stale_ttl, lock_key),
+                        daemon=True
+                    ).start()
+                return entry['payload']
+            
+            payload = compute()
+            _store(key, payload, ttl, stale_ttl)
+            return payload
+        return wrapper
+    return decorator
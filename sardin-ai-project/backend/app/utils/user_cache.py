@@ -0,0 +1,45 @@
+"""
+Short-lived per-process cache of serialized user profiles
+
+Repeat profile reads from the same user within USER_CACHE_TTL seconds are
+served without a SELECT. Updates made through this process invalidate the
+entry at once; other workers may serve the old profile until it expires.
+"""
+import threading
+import time
+
+from app import db
+from app.models import User
+
+USER_CACHE_TTL = 60  # seconds
+USER_CACHE_MAXSIZE = 10000
+
+_profiles = {}
+_lock = threading.Lock()
+
+def get_user_profile(user_id):
+    """Return the user's serialized profile, or None if there is no such user"""
+    now = time.monotonic()
+    entry = _profiles.get(user_id)
+    if entry is not None and entry[0] > now:
+        return entry[1]
+    
+    user = db.session.get(User, user_id)
+    if user is None:
+        return None
+    
+    profile = user.to_dict()
+    with _lock:
+        if len(_profiles) >= USER_CACHE_MAXSIZE:
+            # Drop expired entries, then the oldest if the cache is still full
+            for key in [key for key, (expires, _) in _profiles.items() if expires <= now]:
+                del _profiles[key]
+            if len(_profiles) >= USER_CACHE_MAXSIZE:
+                del _profiles[next(iter(_profiles))]
+        _profiles[user_id] = (now + USER_CACHE_TTL, profile)
+    return profile
+
+def invalidate_user_profile(user_id):
+    """Forget the cached profile of a user after it changes"""
+    with _lock:
+        _profiles.pop(user_id, None)
@@ -0,0 +1,23 @@
+"""
+Request body validation with consistent 400 responses
+"""
+from typing import Any, Dict, Iterable
+
+from flask import request
+
+class ValidationError(ValueError):
+    """A request body that is malformed or missing required fields"""
+
+def json_body(required_fields: Iterable[str] = ()) -> Dict[str, Any]:
+    """
+    Return the request's JSON object, raising ValidationError if the body
+    isn't one or lacks any of required_fields
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        raise ValidationError('Request body must be a JSON object')
+    
+    missing = [field for field in required_fields if field not in data]
+    if missing:
+        raise ValidationError(f"Missing required field{'s' if len(missing) > 1 else ''}: {', '.join(missing)}")
+    return data
@@ -1,6 +1,8 @@
 import os
 from datetime import timedelta
 
+basedir = os.path.abspath(os.path.dirname(__file__))
+
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key-change-in-production'
     
@@ -23,15 +25,58 @@ class Config:
     REDIS_URL = os.environ.get('REDIS_URL') or 'redis://localhost:6379/0'
     
     # Rate Limiting
-    RATELIMIT_STORAGE_URL = os.environ.get('REDIS_URL') or 'redis://localhost:6379/1'
+    RATELIMIT_STORAGE_URI = os.environ.get('REDIS_URL') or 'redis://localhost:6379/1'
+    
+    # Background tasks
+    CELERY = {
+        'broker_url': os.environ.get('REDIS_URL') or 'redis://localhost:6379/0',
+        'task_ignore_result': True,
+        'beat_schedule': {
+            'maintain-vessel-track-partitions': {
+                'task': 'app.tasks.maintain_vessel_track_partitions',
+                'schedule': 3600.0
+            },
+            'fail-stale-analyses': {
+                'task': 'app.tasks.fail_stale_analyses',
+                'schedule': 300.0
+            },
+            'fail-stale-reports': {
+                'task': 'app.tasks.fail_stale_reports',
+                'schedule': 300.0
+            },
+            'purge-expired-predictions': {
+                'task': 'app.tasks.purge_expired_predictions',
+                'schedule': 300.0
+            },
+            'reconcile-report-files': {
+                'task': 'app.tasks.reconcile_report_files',
+                'schedule': 86400.0
+            }
+        }
+    }
     
     # Cache
     CACHE_TYPE = 'RedisCache'
     CACHE_REDIS_URL = os.environ.get('REDIS_URL') or 'redis://localhost:6379/2'
     
+    # Response compression, best codec the client accepts first; small
+    # bodies aren't worth the CPU
+    COMPRESS_ALGORITHM = ['zstd', 'br', 'gzip']
+    COMPRESS_MIN_SIZE = 1024
+    
     # File Upload
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
     UPLOAD_FOLDER = 'uploads'
+    
+    # Report files; an absolute path so the web app, workers and nginx,
+    # which share this directory as a volume, agree on where files live
+    REPORTS_DIR = os.environ.get('REPORTS_DIR') or os.path.join(basedir, 'reports')
+    
+    # Report downloads: let the front web server send the file body.
+    # The prefix names an internal nginx location aliased to the reports directory;
+    # USE_X_SENDFILE is read by Flask's send_file for Apache
+    REPORTS_ACCEL_REDIRECT_PREFIX = os.environ.get('REPORTS_ACCEL_REDIRECT_PREFIX')
+    USE_X_SENDFILE = os.environ.get('USE_X_SENDFILE', '').lower() == 'true'
 
 class DevelopmentConfig(Config):
     DEBUG = True
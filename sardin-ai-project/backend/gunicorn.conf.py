@@ -0,0 +1,26 @@
+# Gunicorn configuration for SARDIN-AI backend
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+
+# Import wsgi.py (and its model warmup) in the master before forking
+preload_app = True
+
+workers = int(os.environ.get('GUNICORN_WORKERS', os.cpu_count() or 1))
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+
+timeout = 120
+
+def post_fork(server, worker):
+    """
+    Give each worker its own database connections
+
+    create_app pre-warms the pool in the master, so without this every
+    worker would inherit and share the same psycopg2 socket. close=False
+    leaves the parent's connection alone instead of closing it from a child.
+    """
+    from app import db
+    from wsgi import app
+    with app.app_context():
+        db.engine.dispose(close=False)
@@ -0,0 +1,15 @@
+#!/usr/bin/env python3
+
+# SARDIN-AI WSGI Entry Point
+import os
+from app import create_app
+from app.services.prediction_service import PredictionService
+
+app = create_app(os.environ.get('FLASK_ENV', 'production'))
+
+# Load the prediction models once; with gunicorn's preload_app the forked
+# workers inherit them copy-on-write instead of each building their own
+PredictionService().warmup()
+
+if __name__ == '__main__':
+    app.run(host='0.0.0.0', port=int(os.environ.get('PORT', 5000)))
@@ -0,0 +1,119 @@
+-- SARDIN-AI migration 2: partition vessel_tracks by day
+-- Moves an existing unpartitioned vessel_tracks table into a daily
+-- range-partitioned one. Fresh installs get this layout from schema.sql.
+
+BEGIN;
+
+-- The activity view depends on the table; it is recreated below
+DROP VIEW vessel_activity_summary;
+
+ALTER TABLE vessel_tracks RENAME TO vessel_tracks_unpartitioned;
+ALTER INDEX vessel_tracks_pkey RENAME TO vessel_tracks_unpartitioned_pkey;
+ALTER SEQUENCE vessel_tracks_id_seq OWNED BY NONE;
+
+CREATE TABLE vessel_tracks (
+    id INTEGER NOT NULL DEFAULT nextval('vessel_tracks_id_seq'),
+    mmsi VARCHAR(20) NOT NULL, -- Maritime Mobile Service Identity
+    vessel_name VARCHAR(100),
+    vessel_type VARCHAR(50),
+    latitude DECIMAL(10, 8) NOT NULL,
+    longitude DECIMAL(11, 8) NOT NULL,
+    speed DECIMAL(5, 2), -- knots
+    course DECIMAL(5, 2), -- degrees
+    timestamp TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    data_source VARCHAR(20) DEFAULT 'ais' CHECK (data_source IN ('ais', 'marinetraffic', 'user_input')),
+    geom GEOMETRY(POINT, 4326),
+    
+    PRIMARY KEY (id, timestamp),
+    CONSTRAINT valid_vessel_coordinates CHECK (
+        latitude >= -90 AND latitude <= 90 AND
+        longitude >= -180 AND longitude <= 180
+    )
+) PARTITION BY RANGE (timestamp);
+
+ALTER SEQUENCE vessel_tracks_id_seq OWNED BY vessel_tracks.id;
+
+CREATE TABLE vessel_tracks_default PARTITION OF vessel_tracks DEFAULT;
+
+-- Create function to add the daily vessel track partitions from days_back
+-- days ago through days_ahead days from now
+CREATE OR REPLACE FUNCTION create_vessel_track_partitions(
+    days_ahead INTEGER DEFAULT 7,
+    days_back INTEGER DEFAULT 1
+)
+RETURNS VOID AS $$
+DECLARE
+    day DATE;
+BEGIN
+    FOR day IN
+        SELECT generate_series(CURRENT_DATE - days_back, CURRENT_DATE + days_ahead, INTERVAL '1 day')::DATE
+    LOOP
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS %I PARTITION OF vessel_tracks FOR VALUES FROM (%L) TO (%L)',
+            'vessel_tracks_' || to_char(day, 'YYYYMMDD'), day, day + 1
+        );
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Create function to drop daily vessel track partitions older than retention_days
+CREATE OR REPLACE FUNCTION drop_old_vessel_track_partitions(retention_days INTEGER DEFAULT 30)
+RETURNS INTEGER AS $$
+DECLARE
+    partition_name TEXT;
+    dropped_count INTEGER := 0;
+BEGIN
+    FOR partition_name IN
+        SELECT child.relname
+        FROM pg_inherits
+        JOIN pg_class parent ON pg_inherits.inhparent = parent.oid
+        JOIN pg_class child ON pg_inherits.inhrelid = child.oid
+        WHERE parent.relname = 'vessel_tracks'
+          AND child.relname ~ '^vessel_tracks_[0-9]{8}$'
+          AND to_date(right(child.relname, 8), 'YYYYMMDD') < CURRENT_DATE - retention_days
+    LOOP
+        EXECUTE format('DROP TABLE %I', partition_name);
+        dropped_count := dropped_count + 1;
+    END LOOP;
+    
+    RETURN dropped_count;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Partitions for the retained history are created before copying, so old
+-- rows don't all land in the default partition
+SELECT create_vessel_track_partitions(7, 30);
+
+INSERT INTO vessel_tracks
+SELECT id, mmsi, vessel_name, vessel_type, latitude, longitude, speed, course,
+       COALESCE(timestamp, CURRENT_TIMESTAMP), data_source, geom
+FROM vessel_tracks_unpartitioned;
+
+DROP TABLE vessel_tracks_unpartitioned;
+
+CREATE INDEX idx_vessel_tracks_geom ON vessel_tracks USING GIST (geom);
+CREATE INDEX idx_vessel_tracks_mmsi_timestamp ON vessel_tracks(mmsi, timestamp);
+CREATE INDEX idx_vessel_tracks_timestamp ON vessel_tracks(timestamp);
+CREATE INDEX idx_vessel_tracks_timestamp_id ON vessel_tracks(timestamp DESC, id DESC);
+CREATE INDEX idx_vessel_tracks_type_timestamp ON vessel_tracks(vessel_type, timestamp DESC, id DESC) WHERE vessel_type IS NOT NULL;
+CREATE INDEX idx_vessel_tracks_source ON vessel_tracks(data_source);
+
+CREATE VIEW vessel_activity_summary AS
+SELECT 
+    DATE_TRUNC('day', timestamp) as day,
+    data_source,
+    COUNT(*) as vessel_count,
+    AVG(speed) as avg_speed,
+    COUNT(DISTINCT mmsi) as unique_vessels
+FROM vessel_tracks
+WHERE timestamp >= CURRENT_TIMESTAMP - INTERVAL '30 days'
+GROUP BY DATE_TRUNC('day', timestamp), data_source
+ORDER BY day DESC;
+
+ALTER TABLE vessel_tracks ENABLE ROW LEVEL SECURITY;
+CREATE POLICY "Admin can view all vessel tracks" ON vessel_tracks
+    FOR SELECT USING (EXISTS (SELECT 1 FROM users WHERE id = auth.uid()::integer AND role = 'admin'));
+
+INSERT INTO schema_version (version, description) VALUES (2, 'Partition vessel_tracks by day');
+
+COMMIT;
@@ -0,0 +1,26 @@
+-- SARDIN-AI migration 3: indexes for the ocean data and report listings
+-- Covers the user, source and date filters with the timestamp order, and
+-- substring search on location. Fresh installs get these from schema.sql.
+--
+-- CREATE INDEX CONCURRENTLY cannot run inside a transaction block, so this
+-- file has no BEGIN/COMMIT; every statement is safe to re-run.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_ocean_data_user_timestamp_id
+    ON ocean_data(user_id, timestamp DESC, id DESC);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_ocean_data_source_timestamp
+    ON ocean_data(data_source, timestamp DESC);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_ocean_data_location_trgm
+    ON ocean_data USING GIN (location gin_trgm_ops);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_reports_user_generated_id
+    ON reports(user_id, generated_at DESC, id DESC);
+
+-- Superseded by the composite indexes above
+DROP INDEX CONCURRENTLY IF EXISTS idx_ocean_data_user_id;
+DROP INDEX CONCURRENTLY IF EXISTS idx_ocean_data_source;
+DROP INDEX CONCURRENTLY IF EXISTS idx_reports_user_id;
+
+INSERT INTO schema_version (version, description)
+VALUES (3, 'Add ocean data and report listing indexes')
+ON CONFLICT (version) DO NOTHING;
@@ -0,0 +1,13 @@
+-- SARDIN-AI migration 4: track background report generation
+-- Reports are now rendered by a worker; status records their progress.
+-- Existing reports were generated inline and are complete.
+
+BEGIN;
+
+ALTER TABLE reports
+    ADD COLUMN status VARCHAR(20) NOT NULL DEFAULT 'done'
+    CHECK (status IN ('pending', 'running', 'done', 'failed'));
+
+INSERT INTO schema_version (version, description) VALUES (4, 'Add report generation status');
+
+COMMIT;
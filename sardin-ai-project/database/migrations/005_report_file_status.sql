@@ -0,0 +1,15 @@
+-- SARDIN-AI migration 5: track report file state in the database
+-- Downloads read file_status instead of checking the filesystem; a daily
+-- task marks files that have been removed as purged.
+
+BEGIN;
+
+ALTER TABLE reports
+    ADD COLUMN file_status VARCHAR(20) CHECK (file_status IN ('present', 'purged'));
+
+-- Files not actually on disk are picked up by the next reconcile run
+UPDATE reports SET file_status = 'present' WHERE file_path IS NOT NULL AND file_path <> '';
+
+INSERT INTO schema_version (version, description) VALUES (5, 'Track report file status');
+
+COMMIT;
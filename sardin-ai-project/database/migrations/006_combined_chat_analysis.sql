@@ -0,0 +1,12 @@
+-- SARDIN-AI migration 6: allow combined chat analyses
+-- The 'all' analysis type stores sentiment, topics and summary together.
+
+BEGIN;
+
+ALTER TABLE chat_analysis DROP CONSTRAINT chat_analysis_analysis_type_check;
+ALTER TABLE chat_analysis ADD CONSTRAINT chat_analysis_analysis_type_check
+    CHECK (analysis_type IN ('sentiment', 'topics', 'summary', 'all'));
+
+INSERT INTO schema_version (version, description) VALUES (6, 'Allow combined chat analyses');
+
+COMMIT;
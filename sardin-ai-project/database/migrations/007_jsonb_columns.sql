@@ -0,0 +1,16 @@
+-- SARDIN-AI migration 7: store JSON documents as JSONB
+-- chat_data, result_data and prediction_factors were TEXT holding JSON
+-- strings; the application now reads and writes them as native JSON.
+-- Fresh installs get these column types and the index from schema.sql.
+
+BEGIN;
+
+ALTER TABLE chat_sessions ALTER COLUMN chat_data TYPE JSONB USING chat_data::jsonb;
+ALTER TABLE chat_analysis ALTER COLUMN result_data TYPE JSONB USING result_data::jsonb;
+ALTER TABLE fish_predictions ALTER COLUMN prediction_factors TYPE JSONB USING prediction_factors::jsonb;
+
+CREATE INDEX idx_chat_analysis_result_data ON chat_analysis USING GIN (result_data);
+
+INSERT INTO schema_version (version, description) VALUES (7, 'Store JSON documents as JSONB');
+
+COMMIT;
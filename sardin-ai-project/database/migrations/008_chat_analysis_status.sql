@@ -0,0 +1,13 @@
+-- SARDIN-AI migration 8: track background chat analyses
+-- Analyses are now run by a worker; status records their progress.
+-- Existing analyses were run inline and are complete.
+
+BEGIN;
+
+ALTER TABLE chat_analysis
+    ADD COLUMN status VARCHAR(20) NOT NULL DEFAULT 'done'
+    CHECK (status IN ('pending', 'running', 'done', 'failed'));
+
+INSERT INTO schema_version (version, description) VALUES (8, 'Add chat analysis status');
+
+COMMIT;
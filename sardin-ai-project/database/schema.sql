@@ -5,6 +5,7 @@
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
 CREATE EXTENSION IF NOT EXISTS "postgis";
 CREATE EXTENSION IF NOT EXISTS "pgcrypto";
+CREATE EXTENSION IF NOT EXISTS "pg_trgm";
 
 -- Users table for authentication and authorization
 CREATE TABLE users (
@@ -23,7 +24,7 @@ CREATE TABLE chat_sessions (
     id SERIAL PRIMARY KEY,
     user_id INTEGER REFERENCES users(id) ON DELETE CASCADE,
     title VARCHAR(200) NOT NULL,
-    chat_data TEXT NOT NULL, -- JSON string
+    chat_data JSONB NOT NULL,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
 
@@ -31,9 +32,10 @@ CREATE TABLE chat_sessions (
 CREATE TABLE chat_analysis (
     id SERIAL PRIMARY KEY,
     chat_session_id INTEGER REFERENCES chat_sessions(id) ON DELETE CASCADE,
-    analysis_type VARCHAR(50) NOT NULL CHECK (analysis_type IN ('sentiment', 'topics', 'summary')),
-    result_data TEXT NOT NULL, -- JSON string
+    analysis_type VARCHAR(50) NOT NULL CHECK (analysis_type IN ('sentiment', 'topics', 'summary', 'all')),
+    result_data JSONB NOT NULL,
     confidence_score FLOAT DEFAULT 0.0 CHECK (confidence_score >= 0 AND confidence_score <= 1),
+    status VARCHAR(20) NOT NULL DEFAULT 'done' CHECK (status IN ('pending', 'running', 'done', 'failed')),
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
 
@@ -74,7 +76,7 @@ CREATE TABLE fish_predictions (
     longitude DECIMAL(11, 8) NOT NULL,
     probability DECIMAL(3, 2) NOT NULL CHECK (probability >= 0 AND probability <= 1),
     confidence_interval DECIMAL(3, 2),
-    prediction_factors TEXT, -- JSON string
+    prediction_factors JSONB,
     model_version VARCHAR(20) DEFAULT '1.0',
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
     expires_at TIMESTAMP WITH TIME ZONE,
@@ -89,9 +91,11 @@ CREATE TABLE fish_predictions (
 SELECT AddGeometryColumn('fish_predictions', 'geom', 4326, 'POINT', 2);
 CREATE INDEX idx_fish_predictions_geom ON fish_predictions USING GIST (geom);
 
--- Vessel tracking table
+-- Vessel tracking table, range-partitioned by day on timestamp: queries on
+-- recent activity only touch the newest partitions, and old history is
+-- dropped a partition at a time instead of with DELETE
 CREATE TABLE vessel_tracks (
-    id SERIAL PRIMARY KEY,
+    id SERIAL,
     mmsi VARCHAR(20) NOT NULL, -- Maritime Mobile Service Identity
     vessel_name VARCHAR(100),
     vessel_type VARCHAR(50),
@@ -99,14 +103,65 @@ CREATE TABLE vessel_tracks (
     longitude DECIMAL(11, 8) NOT NULL,
     speed DECIMAL(5, 2), -- knots
     course DECIMAL(5, 2), -- degrees
-    timestamp TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    timestamp TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
     data_source VARCHAR(20) DEFAULT 'ais' CHECK (data_source IN ('ais', 'marinetraffic', 'user_input')),
     
+    PRIMARY KEY (id, timestamp),
     CONSTRAINT valid_vessel_coordinates CHECK (
         latitude >= -90 AND latitude <= 90 AND
         longitude >= -180 AND longitude <= 180
     )
-);
+) PARTITION BY RANGE (timestamp);
+
+-- Rows outside every daily partition land here instead of failing to insert
+CREATE TABLE vessel_tracks_default PARTITION OF vessel_tracks DEFAULT;
+
+-- Create function to add the daily vessel track partitions from days_back
+-- days ago through days_ahead days from now
+CREATE OR REPLACE FUNCTION create_vessel_track_partitions(
+    days_ahead INTEGER DEFAULT 7,
+    days_back INTEGER DEFAULT 1
+)
+RETURNS VOID AS $$
+DECLARE
+    day DATE;
+BEGIN
+    FOR day IN
+        SELECT generate_series(CURRENT_DATE - days_back, CURRENT_DATE + days_ahead, INTERVAL '1 day')::DATE
+    LOOP
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS %I PARTITION OF vessel_tracks FOR VALUES FROM (%L) TO (%L)',
+            'vessel_tracks_' || to_char(day, 'YYYYMMDD'), day, day + 1
+        );
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Create function to drop daily vessel track partitions older than retention_days
+CREATE OR REPLACE FUNCTION drop_old_vessel_track_partitions(retention_days INTEGER DEFAULT 30)
+RETURNS INTEGER AS $$
+DECLARE
+    partition_name TEXT;
+    dropped_count INTEGER := 0;
+BEGIN
+    FOR partition_name IN
+        SELECT child.relname
+        FROM pg_inherits
+        JOIN pg_class parent ON pg_inherits.inhparent = parent.oid
+        JOIN pg_class child ON pg_inherits.inhrelid = child.oid
+        WHERE parent.relname = 'vessel_tracks'
+          AND child.relname ~ '^vessel_tracks_[0-9]{8}$'
+          AND to_date(right(child.relname, 8), 'YYYYMMDD') < CURRENT_DATE - retention_days
+    LOOP
+        EXECUTE format('DROP TABLE %I', partition_name);
+        dropped_count := dropped_count + 1;
+    END LOOP;
+    
+    RETURN dropped_count;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT create_vessel_track_partitions();
 
 -- Add PostGIS geometry column for vessel tracks
 SELECT AddGeometryColumn('vessel_tracks', 'geom', 4326, 'POINT', 2);
@@ -120,6 +175,8 @@ CREATE TABLE reports (
     report_type VARCHAR(50) NOT NULL CHECK (report_type IN ('pdf', 'markdown', 'analysis')),
     content TEXT NOT NULL,
     file_path VARCHAR(500),
+    status VARCHAR(20) NOT NULL DEFAULT 'done' CHECK (status IN ('pending', 'running', 'done', 'failed')),
+    file_status VARCHAR(20) CHECK (file_status IN ('present', 'purged')),
     generated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
 
@@ -128,21 +185,30 @@ CREATE INDEX idx_users_username ON users(username);
 CREATE INDEX idx_users_email ON users(email);
 CREATE INDEX idx_chat_sessions_user_id ON chat_sessions(user_id);
 CREATE INDEX idx_chat_sessions_created_at ON chat_sessions(created_at);
+CREATE INDEX idx_chat_sessions_user_created_id ON chat_sessions(user_id, created_at DESC, id DESC);
 CREATE INDEX idx_chat_analysis_session_id ON chat_analysis(chat_session_id);
 CREATE INDEX idx_chat_analysis_type ON chat_analysis(analysis_type);
-CREATE INDEX idx_ocean_data_user_id ON ocean_data(user_id);
+CREATE INDEX idx_chat_analysis_result_data ON chat_analysis USING GIN (result_data);
 CREATE INDEX idx_ocean_data_timestamp ON ocean_data(timestamp);
-CREATE INDEX idx_ocean_data_source ON ocean_data(data_source);
+CREATE INDEX idx_ocean_data_source_timestamp ON ocean_data(data_source, timestamp DESC);
+CREATE INDEX idx_ocean_data_location_trgm ON ocean_data USING GIN (location gin_trgm_ops);
+CREATE INDEX idx_ocean_data_location_timestamp ON ocean_data(latitude, longitude, timestamp);
+CREATE INDEX idx_ocean_data_user_timestamp_id ON ocean_data(user_id, timestamp DESC, id DESC);
 CREATE INDEX idx_fish_predictions_user_id ON fish_predictions(user_id);
 CREATE INDEX idx_fish_predictions_species ON fish_predictions(species);
 CREATE INDEX idx_fish_predictions_created_at ON fish_predictions(created_at);
 CREATE INDEX idx_fish_predictions_expires_at ON fish_predictions(expires_at);
-CREATE INDEX idx_vessel_tracks_mmsi ON vessel_tracks(mmsi);
+CREATE INDEX idx_fish_predictions_species_location ON fish_predictions(species, latitude, longitude);
+CREATE INDEX idx_fish_predictions_user_created_id ON fish_predictions(user_id, created_at DESC, id DESC);
+CREATE INDEX idx_fish_predictions_species_expires ON fish_predictions(species, expires_at) INCLUDE (probability, latitude, longitude) WHERE expires_at IS NOT NULL;
+CREATE INDEX idx_vessel_tracks_mmsi_timestamp ON vessel_tracks(mmsi, timestamp);
 CREATE INDEX idx_vessel_tracks_timestamp ON vessel_tracks(timestamp);
+CREATE INDEX idx_vessel_tracks_timestamp_id ON vessel_tracks(timestamp DESC, id DESC);
+CREATE INDEX idx_vessel_tracks_type_timestamp ON vessel_tracks(vessel_type, timestamp DESC, id DESC) WHERE vessel_type IS NOT NULL;
 CREATE INDEX idx_vessel_tracks_source ON vessel_tracks(data_source);
-CREATE INDEX idx_reports_user_id ON reports(user_id);
 CREATE INDEX idx_reports_type ON reports(report_type);
 CREATE INDEX idx_reports_generated_at ON reports(generated_at);
+CREATE INDEX idx_reports_user_generated_id ON reports(user_id, generated_at DESC, id DESC);
 
 -- Create updated_at trigger function
 CREATE OR REPLACE FUNCTION update_updated_at_column()
@@ -337,4 +403,12 @@ CREATE TABLE schema_version (
     description TEXT
 );
 
-INSERT INTO schema_version (version, description) VALUES (1, 'Initial schema creation');
\ No newline at end of file
+INSERT INTO schema_version (version, description) VALUES
+(1, 'Initial schema creation'),
+(2, 'Partition vessel_tracks by day'),
+(3, 'Add ocean data and report listing indexes'),
+(4, 'Add report generation status'),
+(5, 'Track report file status'),
+(6, 'Allow combined chat analyses'),
+(7, 'Store JSON documents as JSONB'),
+(8, 'Add chat analysis status');
\ No newline at end of file